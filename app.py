@@ -3,9 +3,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from modules.chat import show_chat
+from modules.viewer import show_table
+from modules.network import show_network_panel, get_network_tables
+from modules.rollups import bind_rollup, rollup_context
+from modules.datasets import init_dataset_store, ingest_uploads, remove_dataset
+from modules.runner import compile_formula, prune_frame, is_pruned_column_error
+from modules.export import show_export_panel
 
 st.set_page_config(page_title="Чат Аналитика", layout="wide")
 
+CONTEXT_MAX_ROWS = 200
+
 # Функции для генерации контекста
 def generate_filter_context(df, filters):
     """Генерирует текстовый контекст примененных фильтров"""
@@ -48,7 +56,12 @@ def generate_calculation_context(formula, tables, charts):
         context_lines.append("📋 Результаты расчёта:")
         for name, table in tables:
             context_lines.append(f"\n▸ Таблица: {name}")
-            context_lines.append(table.to_string())
+            if len(table) > CONTEXT_MAX_ROWS:
+                # Большие результаты не разворачиваем в текст целиком
+                context_lines.append(table.head(CONTEXT_MAX_ROWS).to_string())
+                context_lines.append(f"... показаны первые {CONTEXT_MAX_ROWS} из {len(table)} строк")
+            else:
+                context_lines.append(table.to_string())
     
     # Графики
     if charts:
@@ -58,11 +71,213 @@ def generate_calculation_context(formula, tables, charts):
     
     return "\n".join(context_lines)
 
+def build_analysis_prompt(filter_ctx, calc_ctx, rollup_ctx=""):
+    """Формирует промпт для интерпретации результатов"""
+    if rollup_ctx:
+        calc_ctx = f"{calc_ctx}\n\n{rollup_ctx}"
+    return f"""Ты - старший аналитик HR с 15-летним опытом работы в data-driven компаниях.
+Проанализируй данные и дай детальную интерпретацию.
+
+{filter_ctx}
+
+{calc_ctx}
+
+ТВОЯ ЗАДАЧА - дать ИСЧЕРПЫВАЮЩИЙ анализ (400-500 слов):
+
+1. 📈 ОБЩИЙ ТРЕНД (3-4 предложения):
+   - Что происходит с показателями: рост, падение, стабильность?
+   - Насколько сильный тренд (в процентах)?
+   - Сравни с индустриальными бенчмарками
+   - Оцени критичность: КРИТИЧНО / ТРЕВОЖНО / ПРИЕМЛЕМО / ХОРОШО
+
+2. 🔍 КЛЮЧЕВЫЕ НАБЛЮДЕНИЯ (5-6 пунктов):
+   - Выдели 2-3 пиковых периода с точными датами и цифрами
+   - Есть ли сезонность? Если да - опиши паттерн
+   - Аномальные точки: что это может значить?
+   - Скорость изменений (растет ли динамика?)
+
+3. 💡 ВОЗМОЖНЫЕ ПРИЧИНЫ (3-4 варианта с обоснованием):
+   - ПОЧЕМУ так происходит?
+   - Какие внешние/внутренние факторы могли повлиять?
+   - Есть ли признаки системной проблемы?
+
+4. ⚡ РЕКОМЕНДАЦИИ (5 конкретных действий):
+   - Срочные меры (что сделать сегодня-завтра)
+   - Краткосрочные действия (1-2 недели)
+   - Среднесрочная стратегия (1-2 месяца)
+   - Метрики для отслеживания
+   - KPI для измерения эффекта
+
+ВАЖНО:
+- Пиши КОНКРЕТНО с цифрами и датами
+- Давай ПРАКТИЧНЫЕ советы, которые можно применить завтра
+- Объясняй сложные термины простым языком
+- НЕ сокращай анализ - дай полный разбор
+
+Ответ на русском языке."""
+
+def run_formula(formula, df, df_filtered, dataset_name):
+    """Выполняет код пользователя и сохраняет результаты в session_state"""
+    try:
+        import matplotlib.pyplot as plt
+        import plotly.express as px
+        import plotly.graph_objects as go
+
+        # Готовые таблицы (сетевой анализ) и срезы куба доступны коду как переменные
+        ready_vars = get_network_tables(dataset_name, df)
+        rollup = st.session_state.rollups.get(dataset_name)
+        if rollup:
+            ready_vars['rollup'] = bind_rollup(rollup, st.session_state.filters, df, df_filtered)
+
+        # Код компилируется один раз; в df попадают только используемые столбцы
+        code, columns = compile_formula(formula)
+        frame, pruned = prune_frame(df_filtered, columns)
+
+        # Выполняем код и сохраняем все переменные
+        local_vars = {'df': frame, 'pd': pd, 'np': np, 'plt': plt, 'px': px, 'go': go, 'st': st}
+        local_vars.update(ready_vars)
+        try:
+            exec(code, local_vars)
+        except (KeyError, AttributeError) as e:
+            if not pruned or not is_pruned_column_error(e, df_filtered, frame):
+                raise
+            # Столбец выбран способом, не видным при разборе кода - повторяем на полном датасете
+            local_vars = {'df': df_filtered.copy(), 'pd': pd, 'np': np, 'plt': plt, 'px': px, 'go': go, 'st': st}
+            local_vars.update(ready_vars)
+            exec(code, local_vars)
+
+        # Собираем результаты: графики и таблицы
+        charts = []
+        tables = []
+
+        # Ищем созданные объекты (исключаем df, fig, служебные и готовые таблицы)
+        exclude_vars = {'df', 'fig', 'pd', 'np', 'plt', 'px', 'go', 'st'} | set(ready_vars)
+        for var_name, var_value in local_vars.items():
+            if var_name.startswith('_') or var_name in exclude_vars:
+                continue
+
+            # Plotly графики
+            if hasattr(var_value, '__class__') and 'plotly' in str(type(var_value)):
+                charts.append((var_name, var_value))
+            # DataFrame
+            elif isinstance(var_value, pd.DataFrame):
+                tables.append((var_name, var_value))
+            # Series
+            elif isinstance(var_value, pd.Series):
+                tables.append((var_name, var_value.to_frame()))
+
+        # Генерируем контексты
+        filter_ctx = generate_filter_context(df, st.session_state.filters)
+        calc_ctx = generate_calculation_context(formula, tables, charts)
+        rollup_ctx = rollup_context(rollup, st.session_state.filters) if rollup else ""
+
+        # Сохраняем в session_state
+        st.session_state.analysis_context['filter_context'] = filter_ctx
+        st.session_state.analysis_context['calculation_context'] = calc_ctx
+        st.session_state.analysis_context['formula'] = formula
+
+        # Результаты хранятся между перезапусками скрипта (пагинация, сортировка)
+        st.session_state.analysis_result = {
+            'dataset': dataset_name,
+            'charts': charts,
+            'tables': tables,
+            'has_result': 'result' in local_vars,
+            'result': local_vars.get('result'),
+            'filter_context': filter_ctx,
+            'calculation_context': calc_ctx,
+            'rollup_context': rollup_ctx,
+            'error': None
+        }
+    except Exception as e:
+        st.session_state.analysis_result = {'dataset': dataset_name, 'error': str(e)}
+
+def show_analysis_result(dataset_name, key_suffix):
+    """Отображает результаты последнего запуска для выбранного датасета"""
+    analysis_result = st.session_state.get('analysis_result')
+    if not analysis_result or analysis_result['dataset'] != dataset_name:
+        return
+
+    if analysis_result['error']:
+        st.error(f"❌ {analysis_result['error']}")
+        return
+
+    charts = analysis_result['charts']
+    tables = analysis_result['tables']
+    filter_ctx = analysis_result['filter_context']
+    calc_ctx = analysis_result['calculation_context']
+    rollup_ctx = analysis_result['rollup_context']
+
+    # Показываем результаты
+    if charts or tables:
+        st.success("✅ Готово")
+
+        # Графики
+        if charts:
+            for idx, (name, chart) in enumerate(charts):
+                st.plotly_chart(chart, use_container_width=True, key=f"chart_{key_suffix}_{idx}")
+
+        # Вкладки: Данные расчёта, Контекст, Промпт
+        result_tabs = st.tabs(["📋 Данные расчёта", "📄 Контекст", "💬 Промпт"])
+
+        with result_tabs[0]:
+            # Таблицы: в браузер уходит только видимая страница
+            if tables:
+                for idx, (name, table) in enumerate(tables):
+                    with st.expander(f"Таблица: {name}", expanded=True):
+                        show_table(table, key=f"table_{key_suffix}_{idx}")
+            else:
+                st.info("Таблицы не найдены")
+
+        with result_tabs[1]:
+            # Контекст фильтров
+            st.subheader("🔍 Контекст фильтров")
+            st.code(filter_ctx, language="text")
+            st.caption("💡 Выделите текст выше и скопируйте (Ctrl+C)")
+
+            st.divider()
+
+            # Контекст расчётов
+            st.subheader("📊 Контекст расчётов")
+            st.code(calc_ctx, language="text")
+            st.caption("💡 Выделите текст выше и скопируйте (Ctrl+C)")
+
+            # Динамика персонала из куба (если фильтры покрываются кубом)
+            if rollup_ctx:
+                st.divider()
+                st.subheader("📈 Динамика персонала")
+                st.code(rollup_ctx, language="text")
+
+        with result_tabs[2]:
+            # Промпт
+            st.subheader("💬 Промпт для анализа")
+
+            # Формируем промпт с подставленными контекстами
+            default_prompt = build_analysis_prompt(filter_ctx, calc_ctx, rollup_ctx)
+
+            st.code(default_prompt, language="text")
+            st.caption("💡 Используйте кнопку копирования справа сверху или отредактируйте ниже:")
+
+            # Редактируемая версия
+            prompt_text = st.text_area(
+                "Редактировать промпт (опционально):",
+                value=default_prompt,
+                height=400,
+                key=f"prompt_{key_suffix}"
+            )
+
+    # Если есть result - показываем отдельно
+    elif analysis_result['has_result']:
+        st.success("✅ Готово")
+        result = analysis_result['result']
+        if isinstance(result, (int, float)):
+            st.metric("Результат", f"{result:,.2f}")
+        else:
+            st.write(result)
+    else:
+        st.success("✅ Код выполнен")
+
 # Инициализация хранилища данных
-if 'datasets' not in st.session_state:
-    st.session_state.datasets = {}
-if 'column_types' not in st.session_state:
-    st.session_state.column_types = {}
+init_dataset_store()
 if 'filter_reset_counter' not in st.session_state:
     st.session_state.filter_reset_counter = 0
 if 'analysis_context' not in st.session_state:
@@ -84,11 +299,15 @@ with tab1:
         accept_multiple_files=True
     )
     
+    concat_sheets = st.checkbox(
+        "🧩 Объединять листы с одинаковыми столбцами",
+        key="concat_sheets",
+        help="Листы и файлы с одинаковым набором столбцов загружаются как один датасет со столбцом-источником"
+    )
+    
     if uploaded_files:
-        for file in uploaded_files:
-            if file.name not in st.session_state.datasets:
-                df = pd.read_excel(file)
-                st.session_state.datasets[file.name] = df
+        # Все листы всех новых файлов разбираются параллельно
+        ingest_uploads(uploaded_files, concat_sheets)
         
         st.success(f"✅ Загружено файлов: {len(st.session_state.datasets)}")
     
@@ -98,18 +317,35 @@ with tab1:
         
         for name, df in st.session_state.datasets.items():
             with st.expander(f"📄 {name}"):
-                col1, col2, col3 = st.columns(3)
+                col1, col2, col3, col4 = st.columns(4)
                 with col1:
                     st.metric("Строк", len(df))
                 with col2:
                     st.metric("Столбцов", len(df.columns))
                 with col3:
+                    version = st.session_state.dataset_versions[name]
+                    st.metric("Версия", version['version'])
+                    if version['changes']:
+                        changes = version['changes']
+                        st.caption(f"+{changes['added']} / ~{changes['changed']} / −{changes['removed']} строк")
+                    elif version['version'] > 1:
+                        st.caption("Полная перезагрузка")
+                with col4:
                     if st.button("❌ Удалить", key=f"del_{name}"):
-                        del st.session_state.datasets[name]
-                        if name in st.session_state.column_types:
-                            del st.session_state.column_types[name]
+                        remove_dataset(name)
                         st.rerun()
                 
+                # Ключ строк для сравнения версий при повторной загрузке
+                key_options = ["—"] + list(df.columns)
+                current_key = st.session_state.dataset_keys.get(name)
+                selected_key = st.selectbox(
+                    "🔑 Ключ строк (например, табельный номер):",
+                    options=key_options,
+                    index=key_options.index(current_key) if current_key in key_options else 0,
+                    key=f"row_key_{name}"
+                )
+                st.session_state.dataset_keys[name] = None if selected_key == "—" else selected_key
+                
                 # Настройка типов данных
                 if name not in st.session_state.column_types:
                     st.session_state.column_types[name] = {}
@@ -155,8 +391,8 @@ with tab1:
                         )
                         st.session_state.column_types[name][col_name] = selected_type
                 
-                # Таблица с данными
-                st.dataframe(df.head(10), use_container_width=True)
+                # Таблица с данными (постранично, без отправки всего датасета в браузер)
+                show_table(df, key=f"preview_{name}", page_size=10)
 
 with tab2:
     st.header("Аналитика")
@@ -170,6 +406,10 @@ with tab2:
         
         df = st.session_state.datasets[selected_dataset]
         
+        # Сетевой анализ по полному датасету
+        with st.expander("🕸️ Сетевой анализ"):
+            show_network_panel(df, selected_dataset)
+        
         # Инициализация
         if 'filters' not in st.session_state:
             st.session_state.filters = {}
@@ -316,301 +556,30 @@ with tab2:
                     st.info(f"📊 {len(df_filtered)} из {len(df)} строк")
                 
                 st.subheader("📝 Код")
+                if st.session_state.rollups.get(selected_dataset):
+                    st.caption("💡 `rollup(by=..., freq='M'|'Q')` - численность, приёмы, увольнения, текучесть и стаж по периодам")
                 formula = st.text_area("Python:", value="# df - датасет\nresult = df['Столбец'].sum()", height=300)
                 
                 if st.button("▶️ Выполнить", type="primary"):
-                    try:
-                        import matplotlib.pyplot as plt
-                        import plotly.express as px
-                        import plotly.graph_objects as go
-                        
-                        # Выполняем код и сохраняем все переменные
-                        local_vars = {'df': df_filtered.copy(), 'pd': pd, 'np': np, 'plt': plt, 'px': px, 'go': go, 'st': st}
-                        exec(formula, local_vars)
-                        
-                        # Собираем результаты: графики и таблицы
-                        charts = []
-                        tables = []
-                        
-                        # Ищем созданные объекты (исключаем df, fig и служебные)
-                        exclude_vars = {'df', 'fig', 'pd', 'np', 'plt', 'px', 'go', 'st'}
-                        for var_name, var_value in local_vars.items():
-                            if var_name.startswith('_') or var_name in exclude_vars:
-                                continue
-                            
-                            # Plotly графики
-                            if hasattr(var_value, '__class__') and 'plotly' in str(type(var_value)):
-                                charts.append((var_name, var_value))
-                            # DataFrame
-                            elif isinstance(var_value, pd.DataFrame):
-                                tables.append((var_name, var_value))
-                            # Series
-                            elif isinstance(var_value, pd.Series):
-                                tables.append((var_name, var_value.to_frame()))
-                        
-                        # Генерируем контексты
-                        filter_ctx = generate_filter_context(df, st.session_state.filters)
-                        calc_ctx = generate_calculation_context(formula, tables, charts)
-                        
-                        # Сохраняем в session_state
-                        st.session_state.analysis_context['filter_context'] = filter_ctx
-                        st.session_state.analysis_context['calculation_context'] = calc_ctx
-                        st.session_state.analysis_context['formula'] = formula
-                        
-                        # Показываем результаты
-                        if charts or tables:
-                            st.success("✅ Готово")
-                            
-                            # Графики
-                            if charts:
-                                for idx, (name, chart) in enumerate(charts):
-                                    st.plotly_chart(chart, use_container_width=True, key=f"chart_with_filters_{idx}")
-                            
-                            # Вкладки: Данные расчёта, Контекст, Промпт
-                            result_tabs = st.tabs(["📋 Данные расчёта", "📄 Контекст", "💬 Промпт"])
-                            
-                            with result_tabs[0]:
-                                # Таблицы
-                                if tables:
-                                    for idx, (name, table) in enumerate(tables):
-                                        with st.expander(f"Таблица: {name}", expanded=True):
-                                            st.dataframe(table, use_container_width=True, key=f"table_with_filters_{idx}")
-                                else:
-                                    st.info("Таблицы не найдены")
-                            
-                            with result_tabs[1]:
-                                # Контекст фильтров
-                                st.subheader("🔍 Контекст фильтров")
-                                st.code(filter_ctx, language="text")
-                                st.caption("💡 Выделите текст выше и скопируйте (Ctrl+C)")
-                                
-                                st.divider()
-                                
-                                # Контекст расчётов
-                                st.subheader("📊 Контекст расчётов")
-                                st.code(calc_ctx, language="text")
-                                st.caption("💡 Выделите текст выше и скопируйте (Ctrl+C)")
-                            
-                            with result_tabs[2]:
-                                # Промпт
-                                st.subheader("💬 Промпт для анализа")
-                                
-                                # Формируем промпт с подставленными контекстами
-                                default_prompt = f"""Ты - старший аналитик HR с 15-летним опытом работы в data-driven компаниях.
-Проанализируй данные и дай детальную интерпретацию.
-
-{filter_ctx}
-
-{calc_ctx}
-
-ТВОЯ ЗАДАЧА - дать ИСЧЕРПЫВАЮЩИЙ анализ (400-500 слов):
-
-1. 📈 ОБЩИЙ ТРЕНД (3-4 предложения):
-   - Что происходит с показателями: рост, падение, стабильность?
-   - Насколько сильный тренд (в процентах)?
-   - Сравни с индустриальными бенчмарками
-   - Оцени критичность: КРИТИЧНО / ТРЕВОЖНО / ПРИЕМЛЕМО / ХОРОШО
-
-2. 🔍 КЛЮЧЕВЫЕ НАБЛЮДЕНИЯ (5-6 пунктов):
-   - Выдели 2-3 пиковых периода с точными датами и цифрами
-   - Есть ли сезонность? Если да - опиши паттерн
-   - Аномальные точки: что это может значить?
-   - Скорость изменений (растет ли динамика?)
-
-3. 💡 ВОЗМОЖНЫЕ ПРИЧИНЫ (3-4 варианта с обоснованием):
-   - ПОЧЕМУ так происходит?
-   - Какие внешние/внутренние факторы могли повлиять?
-   - Есть ли признаки системной проблемы?
-
-4. ⚡ РЕКОМЕНДАЦИИ (5 конкретных действий):
-   - Срочные меры (что сделать сегодня-завтра)
-   - Краткосрочные действия (1-2 недели)
-   - Среднесрочная стратегия (1-2 месяца)
-   - Метрики для отслеживания
-   - KPI для измерения эффекта
-
-ВАЖНО:
-- Пиши КОНКРЕТНО с цифрами и датами
-- Давай ПРАКТИЧНЫЕ советы, которые можно применить завтра
-- Объясняй сложные термины простым языком
-- НЕ сокращай анализ - дай полный разбор
-
-Ответ на русском языке."""
-                                
-                                st.code(default_prompt, language="text")
-                                st.caption("💡 Используйте кнопку копирования справа сверху или отредактируйте ниже:")
-                                
-                                # Редактируемая версия
-                                prompt_text = st.text_area(
-                                    "Редактировать промпт (опционально):",
-                                    value=default_prompt,
-                                    height=400,
-                                    key="prompt_with_filters"
-                                )
-                        
-                        # Если есть result - показываем отдельно
-                        elif 'result' in local_vars:
-                            st.success("✅ Готово")
-                            result = local_vars['result']
-                            if isinstance(result, (int, float)):
-                                st.metric("Результат", f"{result:,.2f}")
-                            else:
-                                st.write(result)
-                        else:
-                            st.success("✅ Код выполнен")
-                            
-                    except Exception as e:
-                        st.error(f"❌ {e}")
+                    run_formula(formula, df, df_filtered, selected_dataset)
+                
+                show_analysis_result(selected_dataset, "with_filters")
         else:
             if len(df_filtered) < len(df):
                 st.info(f"📊 {len(df_filtered)} из {len(df)} строк")
             
             st.subheader("📝 Код")
+            if st.session_state.rollups.get(selected_dataset):
+                st.caption("💡 `rollup(by=..., freq='M'|'Q')` - численность, приёмы, увольнения, текучесть и стаж по периодам")
             formula = st.text_area("Python:", value="# df - датасет\nresult = df['Столбец'].sum()", height=300)
             
             if st.button("▶️ Выполнить", type="primary"):
-                try:
-                    import matplotlib.pyplot as plt
-                    import plotly.express as px
-                    import plotly.graph_objects as go
-                    
-                    # Выполняем код и сохраняем все переменные
-                    local_vars = {'df': df_filtered.copy(), 'pd': pd, 'np': np, 'plt': plt, 'px': px, 'go': go, 'st': st}
-                    exec(formula, local_vars)
-                    
-                    # Собираем результаты: графики и таблицы
-                    charts = []
-                    tables = []
-                    
-                    # Ищем созданные объекты (исключаем df, fig и служебные)
-                    exclude_vars = {'df', 'fig', 'pd', 'np', 'plt', 'px', 'go', 'st'}
-                    for var_name, var_value in local_vars.items():
-                        if var_name.startswith('_') or var_name in exclude_vars:
-                            continue
-                        
-                        # Plotly графики
-                        if hasattr(var_value, '__class__') and 'plotly' in str(type(var_value)):
-                            charts.append((var_name, var_value))
-                        # DataFrame
-                        elif isinstance(var_value, pd.DataFrame):
-                            tables.append((var_name, var_value))
-                        # Series
-                        elif isinstance(var_value, pd.Series):
-                            tables.append((var_name, var_value.to_frame()))
-                    
-                    # Генерируем контексты
-                    filter_ctx = generate_filter_context(df, st.session_state.filters)
-                    calc_ctx = generate_calculation_context(formula, tables, charts)
-                    
-                    # Сохраняем в session_state
-                    st.session_state.analysis_context['filter_context'] = filter_ctx
-                    st.session_state.analysis_context['calculation_context'] = calc_ctx
-                    st.session_state.analysis_context['formula'] = formula
-                    
-                    # Показываем результаты
-                    if charts or tables:
-                        st.success("✅ Готово")
-                        
-                        # Графики
-                        if charts:
-                            for idx, (name, chart) in enumerate(charts):
-                                st.plotly_chart(chart, use_container_width=True, key=f"chart_no_filters_{idx}")
-                        
-                        # Вкладки: Данные расчёта, Контекст, Промпт
-                        result_tabs = st.tabs(["📋 Данные расчёта", "📄 Контекст", "💬 Промпт"])
-                        
-                        with result_tabs[0]:
-                            # Таблицы
-                            if tables:
-                                for idx, (name, table) in enumerate(tables):
-                                    with st.expander(f"Таблица: {name}", expanded=True):
-                                        st.dataframe(table, use_container_width=True, key=f"table_no_filters_{idx}")
-                            else:
-                                st.info("Таблицы не найдены")
-                        
-                        with result_tabs[1]:
-                            # Контекст фильтров
-                            st.subheader("🔍 Контекст фильтров")
-                            st.code(filter_ctx, language="text")
-                            st.caption("💡 Выделите текст выше и скопируйте (Ctrl+C)")
-                            
-                            st.divider()
-                            
-                            # Контекст расчётов
-                            st.subheader("📊 Контекст расчётов")
-                            st.code(calc_ctx, language="text")
-                            st.caption("💡 Выделите текст выше и скопируйте (Ctrl+C)")
-                        
-                        with result_tabs[2]:
-                            # Промпт
-                            st.subheader("💬 Промпт для анализа")
-                            
-                            # Формируем промпт с подставленными контекстами
-                            default_prompt = f"""Ты - старший аналитик HR с 15-летним опытом работы в data-driven компаниях.
-Проанализируй данные и дай детальную интерпретацию.
-
-{filter_ctx}
-
-{calc_ctx}
-
-ТВОЯ ЗАДАЧА - дать ИСЧЕРПЫВАЮЩИЙ анализ (400-500 слов):
-
-1. 📈 ОБЩИЙ ТРЕНД (3-4 предложения):
-   - Что происходит с показателями: рост, падение, стабильность?
-   - Насколько сильный тренд (в процентах)?
-   - Сравни с индустриальными бенчмарками
-   - Оцени критичность: КРИТИЧНО / ТРЕВОЖНО / ПРИЕМЛЕМО / ХОРОШО
-
-2. 🔍 КЛЮЧЕВЫЕ НАБЛЮДЕНИЯ (5-6 пунктов):
-   - Выдели 2-3 пиковых периода с точными датами и цифрами
-   - Есть ли сезонность? Если да - опиши паттерн
-   - Аномальные точки: что это может значить?
-   - Скорость изменений (растет ли динамика?)
-
-3. 💡 ВОЗМОЖНЫЕ ПРИЧИНЫ (3-4 варианта с обоснованием):
-   - ПОЧЕМУ так происходит?
-   - Какие внешние/внутренние факторы могли повлиять?
-   - Есть ли признаки системной проблемы?
-
-4. ⚡ РЕКОМЕНДАЦИИ (5 конкретных действий):
-   - Срочные меры (что сделать сегодня-завтра)
-   - Краткосрочные действия (1-2 недели)
-   - Среднесрочная стратегия (1-2 месяца)
-   - Метрики для отслеживания
-   - KPI для измерения эффекта
-
-ВАЖНО:
-- Пиши КОНКРЕТНО с цифрами и датами
-- Давай ПРАКТИЧНЫЕ советы, которые можно применить завтра
-- Объясняй сложные термины простым языком
-- НЕ сокращай анализ - дай полный разбор
+                run_formula(formula, df, df_filtered, selected_dataset)
+            
+            show_analysis_result(selected_dataset, "no_filters")
 
-Ответ на русском языке."""
-                            
-                            st.code(default_prompt, language="text")
-                            st.caption("💡 Используйте кнопку копирования справа сверху или отредактируйте ниже:")
-                            
-                            # Редактируемая версия
-                            prompt_text = st.text_area(
-                                "Редактировать промпт (опционально):",
-                                value=default_prompt,
-                                height=400,
-                                key="prompt_no_filters"
-                            )
-                    
-                    # Если есть result - показываем отдельно
-                    elif 'result' in local_vars:
-                        st.success("✅ Готово")
-                        result = local_vars['result']
-                        if isinstance(result, (int, float)):
-                            st.metric("Результат", f"{result:,.2f}")
-                        else:
-                            st.write(result)
-                    else:
-                        st.success("✅ Код выполнен")
-                        
-                except Exception as e:
-                    st.error(f"❌ {e}")
+        with st.expander("📤 Экспорт"):
+            show_export_panel(df_filtered, selected_dataset)
     else:
         st.info("📂 Загрузите файлы")
 
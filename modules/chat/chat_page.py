@@ -2,6 +2,8 @@
 import streamlit as st
 import requests
 
+from .response_cache import get_cached_response, store_response
+
 
 def get_ollama_models():
     """Получить список моделей из Ollama"""
@@ -26,15 +28,49 @@ def unload_model(model):
         pass  # Игнорируем ошибки выгрузки
 
 
-def send_message_to_ollama(model, messages):
-    """Отправить сообщение в Ollama с контекстом"""
+def get_model_digest(model):
+    """Digest модели: после обновления модели кэш ответов не используется"""
+    try:
+        response = requests.get("http://localhost:11434/api/tags")
+        if response.status_code == 200:
+            for item in response.json().get("models", []):
+                if item["name"] == model:
+                    return item.get("digest", "")
+        return ""
+    except:
+        return ""
+
+
+def send_message_to_ollama(model, messages, options=None, use_cache=True, near_duplicate=False):
+    """Отправить сообщение в Ollama с контекстом (повторные запросы - из кэша).
+
+    Ключ кэша строится по тем же options, что уходят в Ollama.
+    """
+    digest = get_model_digest(model) if use_cache else ""
+    if use_cache:
+        try:
+            cached = get_cached_response(model, digest, options, messages, near_duplicate=near_duplicate)
+            if cached is not None:
+                return cached
+        except Exception:
+            pass  # Кэш недоступен - идём в Ollama
+
     try:
+        payload = {"model": model, "messages": messages, "stream": False}
+        if options:
+            payload["options"] = options
         response = requests.post(
             "http://localhost:11434/api/chat",
-            json={"model": model, "messages": messages, "stream": False}
+            json=payload
         )
         if response.status_code == 200:
-            return response.json()["message"]["content"]
+            content = response.json()["message"]["content"]
+            if use_cache:
+                try:
+                    store_response(model, digest, options, messages, content)
+                except Exception:
+                    pass
+            return content
         return "Ошибка ответа"
     except Exception as e:
         return f"Ошибка: {str(e)}"
@@ -56,6 +92,11 @@ def show_chat():
         return
 
     selected_model = st.selectbox("Модель", models)
+    near_duplicate = st.checkbox(
+        "♻️ Отвечать из кэша на похожие вопросы",
+        key="chat_near_duplicate",
+        help="Почти совпадающий вопрос в том же контексте получит сохранённый ответ без генерации"
+    )
     
     # Отслеживание переключения модели
     if st.session_state.current_model and st.session_state.current_model != selected_model:
@@ -81,7 +122,11 @@ def show_chat():
         st.session_state.messages.append({"role": "user", "content": user_input})
         
         with st.spinner("..."):
-            response = send_message_to_ollama(selected_model, st.session_state.messages)
+            response = send_message_to_ollama(
+                selected_model,
+                st.session_state.messages,
+                near_duplicate=near_duplicate
+            )
         
         st.session_state.messages.append({"role": "assistant", "content": response})
         st.rerun()
\ No newline at end of file
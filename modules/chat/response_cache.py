@@ -0,0 +1,146 @@
+# PROJECT_ROOT: modules/chat/response_cache.py
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+
+CACHE_PATH = Path(__file__).resolve().parents[2] / "cache" / "llm_responses.sqlite"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+NEAR_DUPLICATE_DISTANCE = 3
+NEAR_DUPLICATE_CANDIDATES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    context_key TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_context ON responses (context_key);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def _connect(path=CACHE_PATH):
+    """Соединение с базой кэша (отдельное на каждый вызов - Streamlit многопоточный)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def normalize_text(text):
+    """Нормализация текста сообщения: пробелы и переносы схлопываются"""
+    return re.sub(r"\s+", " ", str(text)).strip()
+
+
+def _digest(payload):
+    """Хэш JSON-представления"""
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _simhash(text, bits=64):
+    """SimHash по словесным триграммам - для поиска почти одинаковых вопросов"""
+    words = re.findall(r"\w+", text.lower())
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+    weights = [0] * bits
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+    # SQLite хранит знаковые 64-битные целые
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def cache_keys(model, digest, options, messages):
+    """Ключ ответа, ключ контекста (всё, кроме последнего сообщения) и SimHash вопроса"""
+    normalized = [{"role": msg["role"], "content": normalize_text(msg["content"])} for msg in messages]
+    context = {"model": model, "digest": digest or "", "options": options or {}, "messages": normalized[:-1]}
+    key = _digest({**context, "messages": normalized})
+    last = normalized[-1]["content"] if normalized else ""
+    return key, _digest(context), _simhash(last)
+
+
+def get_cached_response(model, digest, options, messages, near_duplicate=False, path=CACHE_PATH):
+    """Ответ из кэша: точное совпадение или (опционально) почти такой же вопрос в том же контексте"""
+    key, context_key, simhash = cache_keys(model, digest, options, messages)
+    now = time.time()
+    with closing(_connect(path)) as connection, connection:
+        row = connection.execute(
+            "SELECT key, response FROM responses WHERE key = ? AND created >= ?",
+            (key, now - CACHE_TTL_SECONDS)
+        ).fetchone()
+
+        if row is None and near_duplicate:
+            candidates = connection.execute(
+                "SELECT key, response, simhash FROM responses WHERE context_key = ? AND created >= ? "
+                "ORDER BY last_used DESC LIMIT ?",
+                (context_key, now - CACHE_TTL_SECONDS, NEAR_DUPLICATE_CANDIDATES)
+            ).fetchall()
+            best = None
+            for candidate_key, response, candidate_hash in candidates:
+                distance = bin((candidate_hash ^ simhash) & ((1 << 64) - 1)).count("1")
+                if distance <= NEAR_DUPLICATE_DISTANCE and (best is None or distance < best[0]):
+                    best = (distance, candidate_key, response)
+            if best:
+                row = best[1:]
+
+        if row is None:
+            return None
+        connection.execute(
+            "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, row[0])
+        )
+        return row[1]
+
+
+def store_response(model, digest, options, messages, response, path=CACHE_PATH):
+    """Сохраняет ответ и вытесняет устаревшие и давно не использованные записи"""
+    key, context_key, simhash = cache_keys(model, digest, options, messages)
+    now = time.time()
+    size = len(response.encode("utf-8"))
+    with closing(_connect(path)) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, context_key, simhash, model, response, size, created, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, context_key, simhash, model, response, size, now, now)
+        )
+        connection.execute("DELETE FROM responses WHERE created < ?", (now - CACHE_TTL_SECONDS,))
+
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > CACHE_MAX_BYTES:
+            # Вытесняем по давности использования, пока не уложимся в лимит
+            freed = 0
+            stale = []
+            for stale_key, stale_size in connection.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                if total - freed <= CACHE_MAX_BYTES:
+                    break
+                stale.append((stale_key,))
+                freed += stale_size
+            connection.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+
+def clear_cache(path=CACHE_PATH):
+    """Полная очистка кэша ответов"""
+    with closing(_connect(path)) as connection, connection:
+        connection.execute("DELETE FROM responses")
+
+
+def cache_stats(path=CACHE_PATH):
+    """Число записей, объём и число попаданий"""
+    with closing(_connect(path)) as connection, connection:
+        count, size, hits = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM responses"
+        ).fetchone()
+    return {"entries": count, "bytes": size, "hits": hits}
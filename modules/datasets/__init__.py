@@ -0,0 +1,5 @@
+from .dataset_store import init_dataset_store, add_dataset, refresh_dataset, remove_dataset, ingest_uploads
+from .ingestion import ingest_workbooks
+from .versioning import content_digest, dataset_version
+
+__all__ = ['init_dataset_store', 'add_dataset', 'refresh_dataset', 'remove_dataset', 'ingest_uploads', 'ingest_workbooks', 'content_digest', 'dataset_version']
\ No newline at end of file
@@ -0,0 +1,159 @@
+# PROJECT_ROOT: modules/datasets/dataset_store.py
+import streamlit as st
+
+from .ingestion import ingest_workbooks
+from .versioning import content_digest, dataset_version, detect_key_column, diff_frames, diff_rows, is_empty_diff
+from modules.rollups import build_rollup, update_rollup
+
+
+def init_dataset_store():
+    """Инициализация хранилища датасетов и зависимых кэшей"""
+    defaults = {
+        'datasets': {},
+        'column_types': {},
+        'rollups': {},
+        'dataset_versions': {},
+        'dataset_keys': {},
+        'processed_uploads': set(),
+    }
+    for name, value in defaults.items():
+        if name not in st.session_state:
+            st.session_state[name] = value
+
+
+def add_dataset(name, df, digest):
+    """Регистрирует новый датасет и строит производные структуры"""
+    st.session_state.datasets[name] = df
+    # Куб HR-показателей строится один раз при загрузке
+    st.session_state.rollups[name] = build_rollup(df)
+    st.session_state.dataset_keys[name] = detect_key_column(df)
+    st.session_state.dataset_versions[name] = {'digest': digest, 'version': 1, 'changes': None}
+
+
+def _invalidate_results(name, df):
+    """Сбрасывает результаты, зависящие от содержимого датасета"""
+    analysis_result = st.session_state.get('analysis_result')
+    if analysis_result and analysis_result['dataset'] == name:
+        del st.session_state['analysis_result']
+
+    # Сетевые метрики сбрасываются, только если изменились их столбцы
+    network = st.session_state.get('network_results', {}).get(name)
+    if network:
+        columns = network['params'][1]
+        if not set(columns) <= set(df.columns) or dataset_version(df, columns) != network['version']:
+            del st.session_state.network_results[name]
+
+
+def refresh_dataset(name, df, digest):
+    """Обновляет датасет новой версией файла с тем же именем.
+
+    Строки сравниваются по ключевому столбцу; в куб показателей вносятся
+    только добавленные, изменённые и удалённые строки. Без ключа или при
+    изменении набора столбцов производные структуры строятся заново.
+    """
+    old = st.session_state.datasets[name]
+    key = st.session_state.dataset_keys.get(name)
+    diff = diff_frames(old, df, key)
+    version = st.session_state.dataset_versions[name]
+
+    if is_empty_diff(diff):
+        # Файл пересохранён без изменений данных
+        version['digest'] = digest
+        return diff
+
+    st.session_state.datasets[name] = df
+
+    rollup = st.session_state.rollups.get(name)
+    if diff is not None and rollup is not None:
+        outgoing, incoming = diff_rows(old, df, key, diff)
+        rollup = update_rollup(rollup, outgoing, incoming)
+    if diff is None or rollup is None:
+        rollup = build_rollup(df)
+    st.session_state.rollups[name] = rollup
+
+    if diff is None:
+        # Набор столбцов мог измениться - убираем типы исчезнувших столбцов
+        types = st.session_state.column_types.get(name, {})
+        for col in list(types):
+            if col not in df.columns:
+                del types[col]
+        if key not in df.columns:
+            st.session_state.dataset_keys[name] = detect_key_column(df)
+
+    _invalidate_results(name, df)
+
+    st.session_state.dataset_versions[name] = {
+        'digest': digest,
+        'version': version['version'] + 1,
+        'changes': None if diff is None else {kind: len(keys) for kind, keys in diff.items()},
+    }
+    return diff
+
+
+def remove_dataset(name):
+    """Удаляет датасет вместе со всеми производными структурами"""
+    st.session_state.datasets.pop(name, None)
+    st.session_state.column_types.pop(name, None)
+    st.session_state.rollups.pop(name, None)
+    st.session_state.dataset_versions.pop(name, None)
+    st.session_state.dataset_keys.pop(name, None)
+    st.session_state.get('network_results', {}).pop(name, None)
+    analysis_result = st.session_state.get('analysis_result')
+    if analysis_result and analysis_result['dataset'] == name:
+        del st.session_state['analysis_result']
+
+
+def ingest_uploads(uploaded_files, concat_sheets=False):
+    """Загружает новые файлы из загрузчика параллельно, с прогрессом по листам"""
+    payloads = []
+    for file in uploaded_files:
+        # Каждая загрузка обрабатывается один раз
+        if file.file_id in st.session_state.processed_uploads:
+            continue
+        data = file.getvalue()
+        known = st.session_state.dataset_versions.get(file.name)
+        if known and known['digest'] == content_digest(data):
+            # Повторная загрузка без изменений
+            st.session_state.processed_uploads.add(file.file_id)
+            continue
+        payloads.append((file, data))
+
+    if not payloads:
+        return
+
+    with st.status(f"Загрузка файлов: {len(payloads)}", expanded=True) as status:
+        progress = st.progress(0.0)
+
+        def on_progress(done, total, file_name, sheet_name, file_done):
+            progress.progress(done / total, text=f"Листов обработано: {done} из {total}")
+            status.write(f"✅ {file_name} / {sheet_name}")
+            if file_done:
+                status.write(f"📄 Файл прочитан: {file_name}")
+
+        datasets, errors = ingest_workbooks(
+            [(file.name, data) for file, data in payloads],
+            concat_sheets=concat_sheets,
+            on_progress=on_progress
+        )
+        for file_name, sheet_name, error in errors:
+            place = file_name if sheet_name is None else f"{file_name} / {sheet_name}"
+            status.write(f"❌ {place}: {error}")
+
+        for name, df, digest in datasets:
+            if name not in st.session_state.datasets:
+                add_dataset(name, df, digest)
+            elif digest != st.session_state.dataset_versions[name]['digest']:
+                # Датасет с тем же именем, но новым содержимым - обновляем по изменившимся строкам
+                refresh_dataset(name, df, digest)
+
+        # Файлы с ошибками тоже отмечаются, чтобы не разбирать их заново при каждом перезапуске
+        for file, _ in payloads:
+            st.session_state.processed_uploads.add(file.file_id)
+        if errors:
+            status.update(
+                label=f"Загружено датасетов: {len(datasets)}, ошибок: {len(errors)}",
+                state="error" if not datasets else "complete",
+                expanded=True
+            )
+        else:
+            status.update(label=f"Загружено датасетов: {len(datasets)}", state="complete", expanded=False)
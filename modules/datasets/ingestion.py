@@ -0,0 +1,156 @@
+# PROJECT_ROOT: modules/datasets/ingestion.py
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from .versioning import content_digest
+
+
+PARTITION_COLUMN = "_источник"
+
+
+def list_sheets(data):
+    """Имена листов книги (читается только структура книги)"""
+    with pd.ExcelFile(io.BytesIO(data)) as workbook:
+        return list(workbook.sheet_names)
+
+
+def parse_sheet(data, sheet_name):
+    """Разбор одного листа; выполняется в отдельном процессе"""
+    return pd.read_excel(io.BytesIO(data), sheet_name=sheet_name)
+
+
+def _parse_all(tasks, workers, on_progress):
+    """Разбирает листы параллельно и сообщает о каждом готовом листе и файле.
+
+    Ошибка разбора одного листа не прерывает остальные: она попадает в
+    список ошибок (файл, лист, текст ошибки).
+    """
+    results = {}
+    errors = []
+    total = len(tasks)
+    remaining = {}
+    for file_name, _, _ in tasks:
+        remaining[file_name] = remaining.get(file_name, 0) + 1
+
+    def report(done, file_name, sheet_name):
+        remaining[file_name] -= 1
+        if on_progress:
+            on_progress(done, total, file_name, sheet_name, remaining[file_name] == 0)
+
+    if workers <= 1 or total <= 1:
+        for done, (file_name, sheet_name, data) in enumerate(tasks, start=1):
+            try:
+                results[(file_name, sheet_name)] = parse_sheet(data, sheet_name)
+            except Exception as e:
+                errors.append((file_name, sheet_name, str(e)))
+            report(done, file_name, sheet_name)
+        return results, errors
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(parse_sheet, data, sheet_name): (file_name, sheet_name)
+            for file_name, sheet_name, data in tasks
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            file_name, sheet_name = futures[future]
+            try:
+                results[(file_name, sheet_name)] = future.result()
+            except Exception as e:
+                errors.append((file_name, sheet_name, str(e)))
+            report(done, file_name, sheet_name)
+    return results, errors
+
+
+def _combined_digest(parts):
+    """Версия датасета, собранного из нескольких листов"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(f"{part['file']}\0{part['sheet']}\0{part['digest']}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _group_parts(parts, concat_sheets):
+    """Группирует листы в датасеты: по одному на лист или по одинаковой схеме"""
+    if not concat_sheets:
+        return [[part] for part in parts]
+    groups = {}
+    for part in parts:
+        schema = tuple(str(col) for col in part['df'].columns)
+        groups.setdefault(schema, []).append(part)
+    return list(groups.values())
+
+
+def _dataset_name(group, sheets_per_file):
+    """Имя датасета: имя файла, если он загружен целиком, иначе файл / лист"""
+    first = group[0]
+    single_file = all(part['file'] == first['file'] for part in group)
+    if single_file and len(group) == sheets_per_file[first['file']]:
+        return first['file']
+    if len(group) > 1:
+        return f"{first['file']} / {first['sheet']} (+{len(group) - 1})"
+    return f"{first['file']} / {first['sheet']}"
+
+
+def ingest_workbooks(files, concat_sheets=False, workers=None, on_progress=None):
+    """Параллельная загрузка книг Excel: все листы всех файлов.
+
+    files - список пар (имя файла, содержимое), on_progress(готово, всего,
+    файл, лист, файл_готов) вызывается по мере разбора листов. Возвращает
+    список (имя датасета, DataFrame, версия) и список ошибок (файл, лист
+    или None, текст) - повреждённый файл или лист не прерывает загрузку
+    остальных. При concat_sheets листы с одинаковыми столбцами объединяются
+    в один датасет со столбцом-источником.
+    """
+    tasks = []
+    digests = {}
+    errors = []
+    for file_name, data in files:
+        try:
+            sheet_names = list_sheets(data)
+        except Exception as e:
+            errors.append((file_name, None, str(e)))
+            continue
+        digests[file_name] = content_digest(data)
+        for sheet_name in sheet_names:
+            tasks.append((file_name, sheet_name, data))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) if tasks else 1
+    parsed, parse_errors = _parse_all(tasks, workers, on_progress)
+    errors.extend(parse_errors)
+
+    parts = []
+    for file_name, sheet_name, _ in tasks:
+        df = parsed.get((file_name, sheet_name))
+        if df is None:
+            continue
+        if df.empty and len(df.columns) == 0:
+            continue
+        parts.append({'file': file_name, 'sheet': sheet_name, 'df': df, 'digest': digests[file_name]})
+
+    sheets_per_file = {}
+    for part in parts:
+        sheets_per_file[part['file']] = sheets_per_file.get(part['file'], 0) + 1
+    for file_name, _, _ in parse_errors:
+        # Файл с нечитаемым листом загружен не целиком - датасеты именуются по листам
+        sheets_per_file[file_name] = sheets_per_file.get(file_name, 0) + 1
+
+    datasets = []
+    for group in _group_parts(parts, concat_sheets):
+        name = _dataset_name(group, sheets_per_file)
+        if len(group) == 1:
+            df = group[0]['df']
+        else:
+            # Партиции объединяются, источник строки сохраняется в отдельном столбце
+            df = pd.concat(
+                [part['df'].assign(**{PARTITION_COLUMN: f"{part['file']} / {part['sheet']}"}) for part in group],
+                ignore_index=True
+            )
+            df[PARTITION_COLUMN] = df[PARTITION_COLUMN].astype('category')
+        whole_file = name == group[0]['file']
+        digest = group[0]['digest'] if whole_file else _combined_digest(group)
+        datasets.append((name, df, digest))
+    return datasets, errors
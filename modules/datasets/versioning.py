@@ -0,0 +1,67 @@
+# PROJECT_ROOT: modules/datasets/versioning.py
+import hashlib
+
+import pandas as pd
+
+
+KEY_KEYWORDS = ('табельн', 'таб.', 'таб №', 'id', 'код сотрудника')
+
+
+def content_digest(data):
+    """Хэш содержимого загруженного файла"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def dataset_version(df, columns):
+    """Хэш содержимого столбцов - версия данных для кэша результатов"""
+    hashed = pd.util.hash_pandas_object(df[list(columns)], index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def detect_key_column(df):
+    """Подбирает столбец-ключ строк: табельный номер или первый уникальный столбец"""
+    unique_columns = [col for col in df.columns if df[col].notna().all() and df[col].is_unique]
+    for col in unique_columns:
+        name = str(col).lower()
+        if any(keyword in name for keyword in KEY_KEYWORDS):
+            return col
+    return unique_columns[0] if unique_columns else None
+
+
+def diff_frames(old, new, key):
+    """Построчное сравнение двух версий датасета по ключу.
+
+    Возвращает индексы ключей added / changed / removed или None, если
+    сравнение невозможно (нет ключа, неуникальный ключ, изменились столбцы).
+    """
+    if key is None or key not in old.columns or key not in new.columns:
+        return None
+    if list(old.columns) != list(new.columns):
+        return None
+    for frame in (old, new):
+        if frame[key].isna().any() or not frame[key].is_unique:
+            return None
+
+    old_indexed = old.set_index(key)
+    new_indexed = new.set_index(key)
+    added = new_indexed.index.difference(old_indexed.index, sort=False)
+    removed = old_indexed.index.difference(new_indexed.index, sort=False)
+    common = new_indexed.index.intersection(old_indexed.index, sort=False)
+
+    old_hash = pd.util.hash_pandas_object(old_indexed.loc[common], index=False).to_numpy()
+    new_hash = pd.util.hash_pandas_object(new_indexed.loc[common], index=False).to_numpy()
+    changed = common[old_hash != new_hash]
+
+    return {'added': added, 'changed': changed, 'removed': removed}
+
+
+def diff_rows(old, new, key, diff):
+    """Строки, которые нужно вычесть (старые версии) и добавить (новые версии)"""
+    outgoing = old[old[key].isin(diff['removed'].union(diff['changed'], sort=False))]
+    incoming = new[new[key].isin(diff['added'].union(diff['changed'], sort=False))]
+    return outgoing, incoming
+
+
+def is_empty_diff(diff):
+    """Нет ни одной изменившейся строки"""
+    return diff is not None and not (len(diff['added']) or len(diff['changed']) or len(diff['removed']))
@@ -0,0 +1,4 @@
+from .export_page import show_export_panel
+from .exporter import export_results, start_export
+
+__all__ = ['show_export_panel', 'export_results', 'start_export']
\ No newline at end of file
@@ -0,0 +1,118 @@
+# PROJECT_ROOT: modules/export/export_page.py
+import time
+from pathlib import Path
+
+import streamlit as st
+
+from .exporter import FORMAT_CSV, FORMAT_PARQUET, FORMAT_XLSX, discard_export, start_export
+
+
+FORMAT_LABELS = {
+    "Excel (XLSX)": FORMAT_XLSX,
+    "Parquet": FORMAT_PARQUET,
+    "CSV": FORMAT_CSV,
+}
+MIME_TYPES = {
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".parquet": "application/octet-stream",
+    ".csv": "text/csv",
+    ".html": "text/html",
+    ".zip": "application/zip",
+}
+
+
+def _collect_objects(df_filtered, dataset_name, include_data, include_tables, include_charts):
+    """Таблицы и графики для выгрузки: отфильтрованный датасет и результаты расчёта"""
+    tables, charts = [], []
+    if include_data:
+        tables.append(("Данные", df_filtered))
+
+    analysis_result = st.session_state.get('analysis_result')
+    if analysis_result and analysis_result['dataset'] == dataset_name and not analysis_result['error']:
+        if include_tables:
+            tables.extend(analysis_result['tables'])
+        if include_charts:
+            charts.extend(analysis_result['charts'])
+    return tables, charts
+
+
+def _show_job(job, dataset_name):
+    """Состояние фоновой выгрузки: выполняется, ошибка или готовый файл"""
+    future = job['future']
+    if not future.done():
+        elapsed = int(time.time() - job['started'])
+        st.info(f"⏳ Выгрузка выполняется ({elapsed} с)...")
+        st.button("🔄 Обновить статус", key=f"export_refresh_{dataset_name}")
+        return
+
+    error = future.exception()
+    if error is not None:
+        st.error(f"❌ {error}")
+    else:
+        path = Path(future.result())
+        size_mb = path.stat().st_size / 1024 / 1024
+        st.success(f"✅ Файл готов: {path.name} ({size_mb:.1f} МБ)")
+        # Файл читается в память сервера только по нажатию, а не при каждом перезапуске
+        if st.button("📦 Получить файл", key=f"export_fetch_{dataset_name}"):
+            with open(path, "rb") as file:
+                st.download_button(
+                    "⬇️ Скачать",
+                    data=file,
+                    file_name=path.name,
+                    mime=MIME_TYPES.get(path.suffix, "application/octet-stream"),
+                    key=f"export_download_{dataset_name}",
+                )
+
+    if st.button("🗑️ Убрать", key=f"export_discard_{dataset_name}"):
+        discard_export(None if error is not None else future.result())
+        del st.session_state.export_jobs[dataset_name]
+        st.rerun()
+
+
+def show_export_panel(df_filtered, dataset_name):
+    """Панель экспорта: выгрузка выполняется в фоне, сессия не блокируется"""
+    if 'export_jobs' not in st.session_state:
+        st.session_state.export_jobs = {}
+
+    analysis_result = st.session_state.get('analysis_result')
+    has_result = bool(analysis_result) and analysis_result['dataset'] == dataset_name \
+        and not analysis_result['error']
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        include_data = st.checkbox(
+            f"Отфильтрованные данные ({len(df_filtered)} строк)", value=True, key=f"export_data_{dataset_name}"
+        )
+    with col2:
+        include_tables = st.checkbox(
+            f"Таблицы расчёта ({len(analysis_result['tables']) if has_result else 0})",
+            value=has_result, disabled=not has_result, key=f"export_tables_{dataset_name}"
+        )
+    with col3:
+        include_charts = st.checkbox(
+            f"Графики в HTML ({len(analysis_result['charts']) if has_result else 0})",
+            value=has_result, disabled=not has_result, key=f"export_charts_{dataset_name}"
+        )
+
+    format_label = st.radio("Формат:", list(FORMAT_LABELS), horizontal=True, key=f"export_format_{dataset_name}")
+    st.caption("💡 XLSX - все таблицы листами одной книги; Parquet и CSV - файл на таблицу, несколько файлов в zip")
+
+    job = st.session_state.export_jobs.get(dataset_name)
+    running = job is not None and not job['future'].done()
+
+    if st.button("📤 Экспортировать", disabled=running, key=f"export_start_{dataset_name}"):
+        tables, charts = _collect_objects(df_filtered, dataset_name, include_data, include_tables, include_charts)
+        if not tables and not charts:
+            st.warning("⚠️ Нечего выгружать")
+        else:
+            if job is not None and job['future'].done() and job['future'].exception() is None:
+                # Предыдущий файл больше не нужен
+                discard_export(job['future'].result())
+            job = {
+                'future': start_export(tables, charts, FORMAT_LABELS[format_label], dataset_name),
+                'started': time.time(),
+            }
+            st.session_state.export_jobs[dataset_name] = job
+
+    if job is not None:
+        _show_job(job, dataset_name)
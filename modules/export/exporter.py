@@ -0,0 +1,194 @@
+# PROJECT_ROOT: modules/export/exporter.py
+import datetime
+import decimal
+import numbers
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.viewer.table_viewer import index_as_columns, write_csv_chunks
+
+
+CHUNK_ROWS = 50_000
+EXCEL_MAX_ROWS = 1_048_576
+EXPORT_WORKERS = 2
+
+FORMAT_XLSX = "xlsx"
+FORMAT_PARQUET = "parquet"
+FORMAT_CSV = "csv"
+
+# Типы, которые xlsxwriter пишет как есть; остальное (Period, Interval...) - строкой
+EXCEL_NATIVE_TYPES = (str, bool, numbers.Number, decimal.Decimal, datetime.date, datetime.time, datetime.timedelta)
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+
+
+def _safe_name(name, limit=None):
+    """Имя файла или листа без недопустимых символов"""
+    cleaned = re.sub(r'[\[\]:*?/\\<>|"]', "_", str(name)).strip() or "table"
+    return cleaned[:limit] if limit else cleaned
+
+
+def _unique_sheet_name(name, used):
+    """Имя листа Excel: до 31 символа и без повторов"""
+    base = _safe_name(name, 31)
+    candidate, index = base, 2
+    while candidate.lower() in used:
+        suffix = f"_{index}"
+        candidate = base[:31 - len(suffix)] + suffix
+        index += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _excel_value(value):
+    """Значение, которое xlsxwriter не умеет записать, приводится к строке"""
+    return value if isinstance(value, EXCEL_NATIVE_TYPES) else str(value)
+
+
+def _excel_values(chunk):
+    """Порция строк в значениях для xlsxwriter: пропуски -> None, даты -> datetime"""
+    converted = {}
+    for col in chunk.columns:
+        values = chunk[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            if getattr(values.dt, "tz", None) is not None:
+                values = values.dt.tz_localize(None)
+            converted[col] = values.astype(object).where(values.notna(), None)
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            floats = values.astype(float)
+            converted[col] = floats.astype(object).where(np.isfinite(floats), None)
+        else:
+            converted[col] = values.astype(object).map(_excel_value).where(values.notna(), None)
+    return zip(*(converted[col] for col in chunk.columns))
+
+
+def write_xlsx(tables, path, chunk_rows=CHUNK_ROWS):
+    """Пишет таблицы листами одной книги в режиме constant_memory (строка за строкой)"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(str(path), {
+        "constant_memory": True, "default_date_format": "dd.mm.yyyy", "remove_timezone": True
+    })
+    try:
+        header_format = workbook.add_format({"bold": True})
+        used = set()
+        for name, table in tables:
+            rows_per_sheet = EXCEL_MAX_ROWS - 1
+            sheet_starts = range(0, max(len(table), 1), rows_per_sheet)
+            for part, sheet_start in enumerate(sheet_starts):
+                # Больше миллиона строк - продолжение на следующих листах
+                sheet_name = name if part == 0 else f"{name}_{part + 1}"
+                worksheet = workbook.add_worksheet(_unique_sheet_name(sheet_name, used))
+                worksheet.write_row(0, 0, [str(col) for col in table.columns], header_format)
+
+                row_index = 1
+                sheet_end = min(sheet_start + rows_per_sheet, len(table))
+                for chunk_start in range(sheet_start, sheet_end, chunk_rows):
+                    chunk = table.iloc[chunk_start:min(chunk_start + chunk_rows, sheet_end)]
+                    for values in _excel_values(chunk):
+                        worksheet.write_row(row_index, 0, values)
+                        row_index += 1
+    finally:
+        workbook.close()
+
+
+def _arrow_chunk(chunk):
+    """Столбцы со смешанными типами приводятся к строкам, чтобы схема была единой"""
+    converted = chunk.copy()
+    for col in converted.columns:
+        if pd.api.types.is_object_dtype(converted[col]):
+            converted[col] = converted[col].astype("string")
+    converted.columns = [str(col) for col in converted.columns]
+    return converted
+
+
+def write_parquet(table, path, chunk_rows=CHUNK_ROWS):
+    """Пишет Parquet группами строк, не собирая всю таблицу Arrow в памяти"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for start in range(0, max(len(table), 1), chunk_rows):
+            chunk = _arrow_chunk(table.iloc[start:start + chunk_rows])
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(str(path), schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_csv(table, path, chunk_rows=CHUNK_ROWS):
+    """Пишет CSV порциями"""
+    with open(path, "w", encoding="utf-8-sig", newline="") as file:
+        write_csv_chunks(table, np.arange(len(table)), file, chunk_rows)
+
+
+def _bundle(files, path):
+    """Собирает несколько файлов в zip (файлы читаются с диска потоково)"""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for file in files:
+            archive.write(file, arcname=file.name)
+    # В каталоге остаётся только архив
+    for file in files:
+        file.unlink()
+    return path
+
+
+def export_results(tables, charts, file_format, base_name="export"):
+    """Экспорт таблиц и графиков во временный каталог; возвращает путь к файлу.
+
+    XLSX - все таблицы листами одной книги, Parquet и CSV - файл на таблицу.
+    Графики сохраняются в HTML. Несколько файлов упаковываются в zip.
+    """
+    directory = Path(tempfile.mkdtemp(prefix="export_"))
+    try:
+        base_name = _safe_name(base_name)
+        files = []
+        # Ключи группировки из индекса выгружаются обычными столбцами
+        tables = [(name, index_as_columns(table)) for name, table in tables]
+
+        if tables:
+            if file_format == FORMAT_XLSX:
+                path = directory / f"{base_name}.xlsx"
+                write_xlsx(tables, path)
+                files.append(path)
+            else:
+                writer = write_parquet if file_format == FORMAT_PARQUET else write_csv
+                for name, table in tables:
+                    path = directory / f"{_safe_name(name)}.{file_format}"
+                    writer(table, path)
+                    files.append(path)
+
+        for name, chart in charts:
+            path = directory / f"{_safe_name(name)}.html"
+            chart.write_html(str(path), include_plotlyjs="cdn")
+            files.append(path)
+
+        if len(files) == 1:
+            return files[0]
+        return _bundle(files, directory / f"{base_name}.zip")
+    except Exception:
+        # Незавершённая выгрузка не должна оставлять каталог во временной папке
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+
+def start_export(tables, charts, file_format, base_name="export"):
+    """Запускает экспорт в фоновом потоке, сессия не блокируется"""
+    return _executor.submit(export_results, tables, charts, file_format, base_name)
+
+
+def discard_export(path):
+    """Удаляет каталог с результатом экспорта"""
+    if path:
+        shutil.rmtree(Path(path).parent, ignore_errors=True)
@@ -0,0 +1,3 @@
+from .network_page import show_network_panel, get_network_tables
+
+__all__ = ['show_network_panel', 'get_network_tables']
\ No newline at end of file
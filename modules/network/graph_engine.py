@@ -0,0 +1,350 @@
+# PROJECT_ROOT: modules/network/graph_engine.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+MAX_GROUP_SIZE = 500
+PARALLEL_MIN_NODES = 5_000
+
+
+# --- Построение графа ---
+
+def _common_ids(sources, targets):
+    """Концы рёбер в общем типе: целые ID не становятся float из-за пропуска у руководителя"""
+    integer_dtype = next(
+        (series.dtype for series in (sources, targets) if pd.api.types.is_integer_dtype(series.dtype)), None
+    )
+    if integer_dtype is None:
+        return sources, targets
+
+    def cast(series):
+        values = series.to_numpy()
+        if pd.api.types.is_float_dtype(series.dtype) and np.array_equal(values, np.floor(values)):
+            return series.astype(integer_dtype)
+        return series
+
+    return cast(sources), cast(targets)
+
+
+def build_graph(sources, targets, weights=None, directed=False):
+    """Строит граф в формате CSR из массивов начал и концов рёбер"""
+    sources = pd.Series(sources).reset_index(drop=True)
+    targets = pd.Series(targets).reset_index(drop=True)
+    valid = sources.notna() & targets.notna() & (sources != targets)
+    sources, targets = _common_ids(sources[valid], targets[valid])
+    if weights is None:
+        weights = np.ones(len(sources))
+    else:
+        weights = pd.to_numeric(pd.Series(weights).reset_index(drop=True)[valid], errors='coerce').fillna(0).to_numpy(float)
+
+    codes, nodes = pd.factorize(pd.concat([sources, targets], ignore_index=True))
+    n = len(nodes)
+    rows, cols = codes[:len(sources)], codes[len(sources):]
+
+    matrix = sparse.coo_matrix((weights, (rows, cols)), shape=(n, n)).tocsr()
+    if not directed:
+        matrix = matrix + matrix.T
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+    return {'matrix': matrix, 'nodes': np.asarray(nodes), 'directed': directed}
+
+
+def graph_from_manager_column(df, employee_col, manager_col):
+    """Граф подчинённости: ребро сотрудник → руководитель"""
+    return build_graph(df[employee_col], df[manager_col], directed=True)
+
+
+def graph_from_membership(df, employee_col, group_col, max_group_size=MAX_GROUP_SIZE):
+    """Граф совместного участия: вес ребра - число общих групп (проектов, отделов)"""
+    pairs = df[[employee_col, group_col]].dropna().drop_duplicates()
+    group_sizes = pairs[group_col].map(pairs[group_col].value_counts())
+    # Очень большие группы дают почти полный граф и не несут сигнала
+    pairs = pairs[group_sizes <= max_group_size]
+
+    emp_codes, nodes = pd.factorize(pairs[employee_col])
+    grp_codes, groups = pd.factorize(pairs[group_col])
+    incidence = sparse.csr_matrix(
+        (np.ones(len(pairs)), (emp_codes, grp_codes)),
+        shape=(len(nodes), len(groups))
+    )
+    matrix = (incidence @ incidence.T).tocsr()
+    matrix.setdiag(0)
+    matrix.eliminate_zeros()
+    return {'matrix': matrix, 'nodes': np.asarray(nodes), 'directed': False}
+
+
+def graph_from_edge_list(df, source_col, target_col, weight_col=None, directed=False):
+    """Граф из списка связей (переписка, встречи)"""
+    weights = df[weight_col] if weight_col else None
+    return build_graph(df[source_col], df[target_col], weights, directed=directed)
+
+
+# --- Метрики ---
+
+def degree_table(graph):
+    """Степени узлов (для взвешенного графа - суммы весов)"""
+    matrix = graph['matrix']
+    binary = (matrix != 0).astype(np.int64)
+    table = pd.DataFrame({'node': graph['nodes']})
+    if graph['directed']:
+        table['out_degree'] = np.asarray(binary.sum(axis=1)).ravel()
+        table['in_degree'] = np.asarray(binary.sum(axis=0)).ravel()
+        table['degree'] = table['out_degree'] + table['in_degree']
+    else:
+        table['degree'] = np.asarray(binary.sum(axis=1)).ravel()
+    table['strength'] = np.asarray(matrix.sum(axis=1)).ravel() + (
+        np.asarray(matrix.sum(axis=0)).ravel() if graph['directed'] else 0
+    )
+    return table
+
+
+def pagerank(graph, alpha=0.85, tol=1e-8, max_iter=100):
+    """PageRank степенным методом на разреженной матрице"""
+    matrix = graph['matrix']
+    n = matrix.shape[0]
+    if n == 0:
+        return np.array([])
+
+    out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inv_out = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    transition_t = (sparse.diags(inv_out) @ matrix).T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        dangling_mass = rank[dangling].sum()
+        new_rank = alpha * (transition_t @ rank) + (alpha * dangling_mass + 1 - alpha) / n
+        if np.abs(new_rank - rank).sum() < n * tol:
+            rank = new_rank
+            break
+        rank = new_rank
+    return rank / rank.sum()
+
+
+def _brandes_from_sources(adjacency, sources):
+    """Вклад в посредничество от кратчайших путей из заданных источников"""
+    n = adjacency.shape[0]
+    adjacency_t = adjacency.T.tocsr()
+    centrality = np.zeros(n)
+    for source in sources:
+        sigma = np.zeros(n)
+        dist = np.full(n, -1)
+        sigma[source] = 1.0
+        dist[source] = 0
+        frontier = np.array([source])
+        levels = []
+        depth = 0
+
+        # Поиск в ширину по уровням: число кратчайших путей считается матрично
+        while len(frontier):
+            levels.append(frontier)
+            front_sigma = np.zeros(n)
+            front_sigma[frontier] = sigma[frontier]
+            reached = adjacency_t @ front_sigma
+            new = (dist < 0) & (reached > 0)
+            depth += 1
+            dist[new] = depth
+            sigma[new] = reached[new]
+            frontier = np.flatnonzero(new)
+
+        # Обратный проход: накопление зависимостей от дальних уровней к ближним
+        delta = np.zeros(n)
+        for level in range(len(levels) - 1, 0, -1):
+            coef = np.zeros(n)
+            current = levels[level]
+            coef[current] = (1.0 + delta[current]) / sigma[current]
+            previous = levels[level - 1]
+            delta[previous] += sigma[previous] * (adjacency[previous] @ coef)
+        delta[source] = 0
+        centrality += delta
+    return centrality
+
+
+def betweenness(graph, samples=256, seed=42, workers=None):
+    """Приближённая центральность посредничества (Brandes по выборке источников)"""
+    matrix = graph['matrix']
+    n = matrix.shape[0]
+    if n == 0:
+        return np.array([])
+
+    adjacency = (matrix != 0).astype(np.float64).tocsr()
+    rng = np.random.default_rng(seed)
+    sample_size = min(samples, n)
+    sources = rng.choice(n, size=sample_size, replace=False)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and n >= PARALLEL_MIN_NODES and sample_size > 1:
+        chunks = [chunk for chunk in np.array_split(sources, workers) if len(chunk)]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            parts = pool.map(_brandes_from_sources, [adjacency] * len(chunks), chunks)
+            centrality = np.sum(list(parts), axis=0)
+    else:
+        centrality = _brandes_from_sources(adjacency, sources)
+
+    centrality *= n / sample_size
+    if not graph['directed']:
+        centrality /= 2
+    if n > 2:
+        centrality /= (n - 1) * (n - 2) / (1 if graph['directed'] else 2)
+    return centrality
+
+
+# --- Сообщества ---
+
+def _undirected(matrix):
+    """Симметричная матрица весов для поиска сообществ"""
+    matrix = matrix + matrix.T
+    return (matrix / 2).tocsr()
+
+
+def _membership(community):
+    """Матрица принадлежности узлов сообществам (n × k)"""
+    n = len(community)
+    return sparse.csr_matrix(
+        (np.ones(n), (np.arange(n), community)),
+        shape=(n, community.max() + 1)
+    )
+
+
+def _partition_quality(edges, community, degree, two_m, resolution):
+    """Модулярность разбиения; edges - (строки, столбцы, веса) симметричной матрицы"""
+    rows, cols, weights = edges
+    same = community[rows] == community[cols]
+    inside = np.bincount(community[rows[same]], weights=weights[same], minlength=community.max() + 1)
+    totals = np.bincount(community, weights=degree)
+    return float((inside / two_m - resolution * (totals / two_m) ** 2).sum())
+
+
+def _local_moving(matrix, resolution, rng, max_sweeps=100, min_gain=1e-7):
+    """Фаза 1 Louvain: синхронные векторные переносы узлов в соседние сообщества.
+
+    Все узлы оценивают лучший перенос одновременно, переносится случайная
+    часть из них; шаг принимается, только если модулярность выросла.
+    """
+    n = matrix.shape[0]
+    degree = np.asarray(matrix.sum(axis=1)).ravel()
+    two_m = degree.sum()
+    community = np.arange(n)
+    coo = matrix.tocoo()
+    edges = (coo.row, coo.col, coo.data)
+    offdiag = matrix - sparse.diags(matrix.diagonal())
+    offdiag.eliminate_zeros()
+    quality = _partition_quality(edges, community, degree, two_m, resolution)
+
+    moved_any = False
+    move_share = 0.5
+    for _ in range(max_sweeps):
+        # links[i, c] - суммарный вес связей узла i с сообществом c
+        links = (offdiag @ _membership(community)).tocsr()
+        totals = np.bincount(community, weights=degree)
+        counts = np.diff(links.indptr)
+        rows = np.repeat(np.arange(n), counts)
+        cols = links.indices
+        own = cols == community[rows]
+        totals_without = totals[cols] - np.where(own, degree[rows], 0)
+        gains = links.data - resolution * totals_without * degree[rows] / two_m
+
+        stay = -resolution * (totals[community] - degree) * degree / two_m
+        stay[rows[own]] = gains[own]
+
+        # Лучшее сообщество в каждой строке
+        best_community = community.copy()
+        best_gain = stay.copy()
+        if len(gains):
+            has_links = counts > 0
+            row_max = np.maximum.reduceat(gains, links.indptr[:-1][has_links])
+            best_gain[has_links] = row_max
+            at_max = np.flatnonzero(gains == np.repeat(row_max, counts[has_links]))
+            best_rows, first = np.unique(rows[at_max], return_index=True)
+            best_community[best_rows] = cols[at_max[first]]
+
+        candidates = (best_gain > stay + 1e-12) & (best_community != community)
+        if not candidates.any():
+            break
+        movers = candidates & (rng.random(n) < move_share)
+        if not movers.any():
+            continue
+
+        trial = community.copy()
+        trial[movers] = best_community[movers]
+        trial_quality = _partition_quality(edges, trial, degree, two_m, resolution)
+        if trial_quality > quality:
+            community, gain, quality = trial, trial_quality - quality, trial_quality
+            moved_any = True
+            if gain < min_gain:
+                break
+        else:
+            # Встречные переносы мешают друг другу - уменьшаем долю переносимых
+            move_share /= 2
+            if move_share < 0.01:
+                break
+
+    _, community = np.unique(community, return_inverse=True)
+    return community, moved_any
+
+
+def modularity(graph, communities, resolution=1.0):
+    """Модулярность разбиения"""
+    matrix = _undirected(graph['matrix'])
+    two_m = matrix.sum()
+    if two_m == 0:
+        return 0.0
+    degree = np.asarray(matrix.sum(axis=1)).ravel()
+    _, communities = np.unique(communities, return_inverse=True)
+    coo = matrix.tocoo()
+    return _partition_quality((coo.row, coo.col, coo.data), communities, degree, two_m, resolution)
+
+
+def louvain(graph, resolution=1.0, seed=42, max_levels=20):
+    """Сообщества методом Louvain на разреженной матрице"""
+    matrix = _undirected(graph['matrix'])
+    n = matrix.shape[0]
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n)
+    if n == 0 or matrix.sum() == 0:
+        return labels
+
+    for _ in range(max_levels):
+        community, moved = _local_moving(matrix, resolution, rng)
+        labels = community[labels]
+        if not moved:
+            break
+        # Фаза 2: сообщества сворачиваются в узлы нового графа
+        membership = _membership(community)
+        matrix = (membership.T @ matrix @ membership).tocsr()
+    return labels
+
+
+# --- Итоговые таблицы ---
+
+def analyze_graph(graph, betweenness_samples=256, resolution=1.0, workers=None):
+    """Считает все метрики и возвращает готовые таблицы узлов и сообществ"""
+    nodes = degree_table(graph)
+    nodes['pagerank'] = pagerank(graph)
+    nodes['betweenness'] = betweenness(graph, samples=betweenness_samples, workers=workers)
+    nodes['community'] = louvain(graph, resolution=resolution)
+
+    communities = (
+        nodes.groupby('community')
+        .agg(size=('node', 'size'), pagerank=('pagerank', 'sum'), avg_degree=('degree', 'mean'))
+        .sort_values('size', ascending=False)
+        .reset_index()
+    )
+    leaders = nodes.sort_values('pagerank', ascending=False).drop_duplicates('community')
+    communities['leader'] = communities['community'].map(leaders.set_index('community')['node'])
+
+    stats = {
+        'nodes': int(graph['matrix'].shape[0]),
+        'edges': int(graph['matrix'].nnz if graph['directed'] else graph['matrix'].nnz // 2),
+        'communities': int(len(communities)),
+        'modularity': modularity(graph, nodes['community'].to_numpy(), resolution),
+    }
+    return {
+        'nodes': nodes.sort_values('pagerank', ascending=False).reset_index(drop=True),
+        'communities': communities,
+        'stats': stats,
+    }
@@ -0,0 +1,130 @@
+# PROJECT_ROOT: modules/network/network_page.py
+import streamlit as st
+
+from .graph_engine import (
+    analyze_graph,
+    graph_from_edge_list,
+    graph_from_manager_column,
+    graph_from_membership,
+)
+from modules.datasets.versioning import dataset_version
+from modules.viewer import show_table
+
+
+SOURCE_MANAGER = "Руководитель"
+SOURCE_MEMBERSHIP = "Совместное участие"
+SOURCE_EDGES = "Список связей"
+
+
+def _build_graph(df, source_type, columns, directed):
+    """Строит граф по выбранному источнику связей"""
+    if source_type == SOURCE_MANAGER:
+        return graph_from_manager_column(df, columns[0], columns[1])
+    if source_type == SOURCE_MEMBERSHIP:
+        return graph_from_membership(df, columns[0], columns[1])
+    weight_col = columns[2] if len(columns) > 2 else None
+    return graph_from_edge_list(df, columns[0], columns[1], weight_col, directed=directed)
+
+
+def compute_network(df, dataset_name, source_type, columns, directed=False,
+                    betweenness_samples=256, resolution=1.0):
+    """Считает сетевые метрики с кэшем по версии датасета и параметрам"""
+    if 'network_results' not in st.session_state:
+        st.session_state.network_results = {}
+
+    params = (source_type, tuple(columns), directed, betweenness_samples, resolution)
+    version = dataset_version(df, columns)
+    cached = st.session_state.network_results.get(dataset_name)
+    if cached and cached['version'] == version and cached['params'] == params:
+        return cached
+
+    graph = _build_graph(df, source_type, columns, directed)
+    result = analyze_graph(graph, betweenness_samples=betweenness_samples, resolution=resolution)
+    cached = {'version': version, 'params': params, **result}
+    st.session_state.network_results[dataset_name] = cached
+    return cached
+
+
+def get_network_tables(dataset_name, df):
+    """Таблицы сетевого анализа для кода пользователя (если актуальны)"""
+    cached = st.session_state.get('network_results', {}).get(dataset_name)
+    if not cached:
+        return {}
+    columns = cached['params'][1]
+    if not set(columns) <= set(df.columns) or dataset_version(df, columns) != cached['version']:
+        return {}
+    return {'net_nodes': cached['nodes'], 'net_communities': cached['communities']}
+
+
+def show_network_panel(df, dataset_name):
+    """Панель сетевого анализа сотрудников"""
+    columns = list(df.columns)
+
+    source_type = st.radio(
+        "Источник связей:",
+        [SOURCE_MANAGER, SOURCE_MEMBERSHIP, SOURCE_EDGES],
+        horizontal=True,
+        key=f"net_source_{dataset_name}"
+    )
+
+    directed = False
+    col1, col2, col3 = st.columns(3)
+    if source_type == SOURCE_MANAGER:
+        with col1:
+            employee_col = st.selectbox("Сотрудник:", columns, key=f"net_emp_{dataset_name}")
+        with col2:
+            manager_col = st.selectbox("Руководитель:", columns, key=f"net_mgr_{dataset_name}")
+        selected = [employee_col, manager_col]
+    elif source_type == SOURCE_MEMBERSHIP:
+        with col1:
+            employee_col = st.selectbox("Сотрудник:", columns, key=f"net_emp_{dataset_name}")
+        with col2:
+            group_col = st.selectbox("Группа (проект, встреча):", columns, key=f"net_grp_{dataset_name}")
+        selected = [employee_col, group_col]
+    else:
+        with col1:
+            source_col = st.selectbox("Отправитель:", columns, key=f"net_src_{dataset_name}")
+        with col2:
+            target_col = st.selectbox("Получатель:", columns, key=f"net_dst_{dataset_name}")
+        with col3:
+            weight_col = st.selectbox("Вес:", ["—"] + columns, key=f"net_w_{dataset_name}")
+            directed = st.checkbox("Направленный граф", key=f"net_dir_{dataset_name}")
+        selected = [source_col, target_col] + ([weight_col] if weight_col != "—" else [])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        samples = st.slider(
+            "Источников для посредничества",
+            min_value=16, max_value=2048, value=256, step=16,
+            help="Больше = точнее оценка betweenness, но дольше расчёт",
+            key=f"net_samples_{dataset_name}"
+        )
+    with col2:
+        resolution = st.slider(
+            "Разрешение сообществ",
+            min_value=0.1, max_value=3.0, value=1.0, step=0.1,
+            help="Больше = мельче сообщества",
+            key=f"net_resolution_{dataset_name}"
+        )
+
+    if st.button("🕸️ Рассчитать сеть", key=f"net_run_{dataset_name}"):
+        if len(set(selected[:2])) < 2:
+            st.error("❌ Выберите разные столбцы для концов связи")
+        else:
+            try:
+                with st.spinner("Расчёт сетевых метрик..."):
+                    compute_network(df, dataset_name, source_type, selected, directed, samples, resolution)
+            except Exception as e:
+                st.error(f"❌ {e}")
+
+    cached = st.session_state.get('network_results', {}).get(dataset_name)
+    if cached:
+        stats = cached['stats']
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Узлов", stats['nodes'])
+        m2.metric("Связей", stats['edges'])
+        m3.metric("Сообществ", stats['communities'])
+        m4.metric("Модулярность", f"{stats['modularity']:.3f}")
+        st.caption("💡 В коде доступны таблицы `net_nodes` и `net_communities`")
+        show_table(cached['nodes'], key=f"net_nodes_{dataset_name}")
+        show_table(cached['communities'], key=f"net_communities_{dataset_name}")
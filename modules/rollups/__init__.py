@@ -0,0 +1,3 @@
+from .rollup_engine import build_rollup, update_rollup, slice_rollup, bind_rollup, rollup_filters, rollup_context
+
+__all__ = ['build_rollup', 'update_rollup', 'slice_rollup', 'bind_rollup', 'rollup_filters', 'rollup_context']
\ No newline at end of file
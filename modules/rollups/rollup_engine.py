@@ -0,0 +1,327 @@
+# PROJECT_ROOT: modules/rollups/rollup_engine.py
+import numpy as np
+import pandas as pd
+
+
+HIRE_KEYWORDS = ('прием', 'приём', 'найм', 'hire')
+EXIT_KEYWORDS = ('увольн', 'termination', 'exit')
+MAX_DIM_CARDINALITY = 100
+MAX_DIMENSIONS = 6
+MAX_CUBE_CELLS = 2_000_000
+
+FLOW_MEASURES = ['hires', 'exits']
+STOCK_MEASURES = ['headcount', 'active_hire_day_sum']
+
+
+def _find_date_column(df, keywords):
+    """Ищет столбец даты по ключевым словам в названии"""
+    for col in df.columns:
+        name = str(col).lower()
+        if 'дата' in name or 'date' in name:
+            if any(keyword in name for keyword in keywords):
+                return col
+    return None
+
+
+def _to_dates(series):
+    """Преобразует столбец в даты (формат ДД.ММ.ГГГГ)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, dayfirst=True, errors='coerce')
+
+
+def _month_index(dates, first):
+    """Номер месяца относительно первого периода куба"""
+    return (dates.dt.year * 12 + dates.dt.month - (first.year * 12 + first.month)).to_numpy(np.int64)
+
+
+def _pick_dimensions(df, exclude, months):
+    """Категориальные столбцы с небольшим числом значений"""
+    candidates = []
+    for col in df.columns:
+        if col in exclude or pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        if not (pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])
+                or isinstance(df[col].dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(df[col])):
+            continue
+        unique_count = df[col].nunique()
+        # Столбец с уникальным значением в каждой строке - идентификатор, а не измерение
+        if 2 <= unique_count <= MAX_DIM_CARDINALITY and unique_count < len(df):
+            candidates.append((unique_count, col))
+
+    candidates.sort()
+    dimensions = [col for _, col in candidates[:MAX_DIMENSIONS]]
+    # Отбрасываем самые детальные измерения, пока куб не уложится в лимит
+    while dimensions:
+        combos = len(df[dimensions].drop_duplicates())
+        if combos * months <= MAX_CUBE_CELLS:
+            break
+        dimensions.pop()
+    return dimensions
+
+
+def _event_dates(df, hire_col, exit_col):
+    """Даты приёма и увольнения; увольнение раньше приёма не учитывается"""
+    hire = _to_dates(df[hire_col])
+    exit_ = _to_dates(df[exit_col]) if exit_col is not None else pd.Series(pd.NaT, index=df.index)
+    valid = hire.notna()
+    return hire[valid], exit_[valid].where(exit_[valid] >= hire[valid]), valid
+
+
+def _accumulate(combo, hire, exit_, first, months, size):
+    """Потоки по ячейкам куба: приёмы, увольнения и суммы дат приёма"""
+    hire_idx = _month_index(hire, first)
+    hire_days = ((hire - pd.Timestamp(0)).dt.days).to_numpy(float)
+    has_exit = exit_.notna().to_numpy()
+    exit_idx = _month_index(exit_[has_exit], first)
+    if (hire_idx < 0).any() or (hire_idx >= months).any() or (exit_idx >= months).any():
+        return None
+
+    hires = np.bincount(combo * months + hire_idx, minlength=size)
+    exits = np.bincount(combo[has_exit] * months + exit_idx, minlength=size)
+    days_in = np.bincount(combo * months + hire_idx, weights=hire_days, minlength=size)
+    days_out = np.bincount(combo[has_exit] * months + exit_idx, weights=hire_days[has_exit], minlength=size)
+    return hires, exits, days_in, days_out
+
+
+def build_rollup(df, hire_col=None, exit_col=None, dimensions=None):
+    """Строит куб HR-показателей: месяц × комбинация измерений.
+
+    Потоки (hires, exits) и остатки (headcount, сумма дат приёма работающих)
+    аддитивны по измерениям, поэтому любой срез получается суммированием
+    строк куба без обращения к исходным данным.
+    """
+    hire_col = hire_col or _find_date_column(df, HIRE_KEYWORDS)
+    if hire_col is None:
+        return None
+    exit_col = exit_col or _find_date_column(df, EXIT_KEYWORDS)
+
+    hire, exit_, valid = _event_dates(df, hire_col, exit_col)
+    if hire.empty:
+        return None
+
+    first = hire.min().to_period('M')
+    last = max(hire.max(), exit_.max() if exit_.notna().any() else hire.max()).to_period('M')
+    periods = pd.period_range(first, last, freq='M')
+    months = len(periods)
+
+    if dimensions is None:
+        dimensions = _pick_dimensions(df, {hire_col, exit_col}, months)
+
+    data = df.loc[valid, dimensions]
+    if dimensions:
+        combo = data.groupby(dimensions, dropna=False, sort=False).ngroup().to_numpy()
+        # ngroup(sort=False) нумерует группы в порядке появления, как drop_duplicates
+        combos = data.drop_duplicates().reset_index(drop=True)
+    else:
+        combo = np.zeros(len(data), dtype=np.int64)
+        combos = pd.DataFrame(index=[0])
+    n_combos = len(combos)
+
+    hires, exits, days_in, days_out = _accumulate(combo, hire, exit_, first, months, n_combos * months)
+
+    shape = (n_combos, months)
+    headcount = np.cumsum((hires - exits).reshape(shape), axis=1)
+    active_hire_day_sum = np.cumsum((days_in - days_out).reshape(shape), axis=1)
+
+    cube = combos.loc[np.repeat(np.arange(n_combos), months), dimensions].reset_index(drop=True)
+    cube['period'] = np.tile(periods, n_combos)
+    cube['hires'] = hires
+    cube['exits'] = exits
+    cube['headcount'] = headcount.ravel()
+    cube['active_hire_day_sum'] = active_hire_day_sum.ravel()
+
+    return {
+        'data': cube,
+        'dimensions': dimensions,
+        'periods': periods,
+        'hire_col': hire_col,
+        'exit_col': exit_col,
+    }
+
+
+def update_rollup(rollup, removed, added):
+    """Инкрементально обновляет куб по изменившимся строкам.
+
+    Вклад удалённых строк (и старых версий изменённых) вычитается, новых -
+    добавляется. Возвращает None, если строки выходят за диапазон месяцев
+    куба или дают новую комбинацию измерений - тогда куб строится заново.
+    """
+    cube = rollup['data']
+    dimensions = rollup['dimensions']
+    periods = rollup['periods']
+    months = len(periods)
+    n_combos = len(cube) // months
+    size = n_combos * months
+    combos = cube.iloc[::months][dimensions].reset_index(drop=True).assign(_combo=np.arange(n_combos))
+
+    delta = [np.zeros(size) for _ in range(4)]
+    for frame, sign in ((removed, -1), (added, 1)):
+        if frame is None or frame.empty:
+            continue
+        if not {rollup['hire_col'], rollup['exit_col'], *dimensions} - {None} <= set(frame.columns):
+            return None
+        hire, exit_, valid = _event_dates(frame, rollup['hire_col'], rollup['exit_col'])
+        if hire.empty:
+            continue
+        if dimensions:
+            combo = frame.loc[valid, dimensions].merge(combos, on=dimensions, how='left')['_combo']
+            if combo.isna().any():
+                return None
+            combo = combo.to_numpy(np.int64)
+        else:
+            combo = np.zeros(len(hire), dtype=np.int64)
+
+        flows = _accumulate(combo, hire, exit_, periods[0], months, size)
+        if flows is None:
+            return None
+        for total, flow in zip(delta, flows):
+            total += sign * flow
+
+    hires, exits, days_in, days_out = delta
+    shape = (n_combos, months)
+    updated = cube.copy()
+    updated['hires'] = cube['hires'].to_numpy() + hires.astype(np.int64)
+    updated['exits'] = cube['exits'].to_numpy() + exits.astype(np.int64)
+    updated['headcount'] = cube['headcount'].to_numpy() + np.cumsum((hires - exits).reshape(shape), axis=1).ravel().astype(np.int64)
+    updated['active_hire_day_sum'] = cube['active_hire_day_sum'].to_numpy() + np.cumsum((days_in - days_out).reshape(shape), axis=1).ravel()
+    return {**rollup, 'data': updated}
+
+
+def _is_date_range(col, values, df=None):
+    """Фильтр по дате задаётся диапазоном [начало, конец] - как в боковой панели"""
+    is_date = 'Дата' in str(col) or (
+        df is not None and col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col])
+    )
+    return is_date and len(values) == 2
+
+
+def filter_rows(df, filters):
+    """Строки датасета по фильтрам: даты - диапазоном, остальное - по значениям.
+
+    Столбцы, которых нет в датасете, пропускаются.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in (filters or {}).items():
+        if not values or col not in df.columns:
+            continue
+        if _is_date_range(col, values, df):
+            start, end = values
+            dates = _to_dates(df[col])
+            mask &= ((dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))).to_numpy()
+        else:
+            mask &= df[col].isin(values).to_numpy()
+    return df[mask]
+
+
+def rollup_filters(rollup, filters):
+    """Фильтры, которые можно применить к кубу; None - если куб их не покрывает"""
+    active = {col: values for col, values in (filters or {}).items() if values}
+    if not set(active) <= set(rollup['dimensions']):
+        return None
+    if any(_is_date_range(col, values) for col, values in active.items()):
+        return None
+    return active
+
+
+def _add_rates(table):
+    """Производные показатели: текучесть и средний стаж"""
+    end_days = (table['period'].dt.end_time.dt.normalize() - pd.Timestamp(0)).dt.days
+    start_headcount = table['headcount'] - table['hires'] + table['exits']
+    average_headcount = (start_headcount + table['headcount']) / 2
+    table['turnover_rate'] = np.where(average_headcount > 0, table['exits'] / average_headcount.where(average_headcount > 0) * 100, np.nan)
+    tenure_days = table['headcount'] * end_days - table['active_hire_day_sum']
+    table['avg_tenure_years'] = np.where(
+        table['headcount'] > 0, tenure_days / table['headcount'].where(table['headcount'] > 0) / 365.25, np.nan
+    )
+    return table.drop(columns='active_hire_day_sum')
+
+
+def slice_rollup(rollup, filters=None, by=None, freq='M', start=None, end=None):
+    """Срез куба: численность на конец периода, приёмы, увольнения, текучесть (%) и стаж.
+
+    filters - {измерение: [значения]}, by - измерения для разбивки,
+    freq - 'M' (месяц) или 'Q' (квартал), start/end - границы периода.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    unknown = [col for col in by if col not in rollup['dimensions']]
+    if unknown:
+        raise KeyError(f"Нет в кубе: {unknown}. Доступные измерения: {rollup['dimensions']}")
+
+    cube = rollup['data']
+    mask = np.ones(len(cube), dtype=bool)
+    for col, values in (filters or {}).items():
+        if not values:
+            continue
+        if col not in rollup['dimensions']:
+            raise KeyError(f"Фильтр по '{col}' не покрывается кубом")
+        mask &= cube[col].isin(values).to_numpy()
+    if start is not None:
+        mask &= (cube['period'] >= pd.Period(start, freq='M')).to_numpy()
+    if end is not None:
+        mask &= (cube['period'] <= pd.Period(end, freq='M')).to_numpy()
+
+    measures = FLOW_MEASURES + STOCK_MEASURES
+    monthly = cube.loc[mask].groupby(by + ['period'], sort=True, dropna=False)[measures].sum().reset_index()
+
+    if freq == 'Q':
+        monthly['period'] = monthly['period'].dt.asfreq('Q')
+        grouped = monthly.groupby(by + ['period'], sort=True, dropna=False)
+        # Потоки суммируются, остатки берутся на конец квартала
+        monthly = grouped[FLOW_MEASURES].sum().join(grouped[STOCK_MEASURES].last()).reset_index()
+    elif freq != 'M':
+        raise ValueError("freq должен быть 'M' или 'Q'")
+
+    return _add_rates(monthly)
+
+
+def rollup_context(rollup, filters, months=12):
+    """Текстовая сводка по кубу за последние месяцы для промпта"""
+    active = rollup_filters(rollup, filters)
+    if active is None:
+        return ""
+    table = slice_rollup(rollup, active).tail(months)
+    if table.empty:
+        return ""
+    table = table.assign(
+        period=table['period'].astype(str),
+        turnover_rate=table['turnover_rate'].round(2),
+        avg_tenure_years=table['avg_tenure_years'].round(2),
+    )
+    return "📈 ДИНАМИКА ПЕРСОНАЛА (последние {} мес.):\n{}".format(len(table), table.to_string(index=False))
+
+
+def _rows_rollup(rollup, rows):
+    """Куб по отобранным строкам с теми же датами и измерениями, что у основного"""
+    return build_rollup(rows, hire_col=rollup['hire_col'], exit_col=rollup['exit_col'],
+                        dimensions=rollup['dimensions'])
+
+
+def bind_rollup(rollup, default_filters, df=None, df_filtered=None):
+    """Функция среза для кода пользователя; по умолчанию - текущие фильтры.
+
+    Если фильтры затрагивают столбцы вне измерений куба (например, диапазон
+    дат), срез считается по кубу из отфильтрованных строк датасета.
+    """
+    row_cubes = {}
+
+    def rollup_slice(by=None, freq='M', filters=None, start=None, end=None):
+        requested = default_filters if filters is None else filters
+        active = rollup_filters(rollup, requested)
+        if active is not None or df is None:
+            active = {col: values for col, values in requested.items() if values}
+            return slice_rollup(rollup, active, by=by, freq=freq, start=start, end=end)
+
+        if filters is None:
+            cache_key, rows = None, df_filtered if df_filtered is not None else df
+        else:
+            cache_key = repr(sorted((str(col), repr(values)) for col, values in filters.items() if values))
+            rows = filter_rows(df, filters)
+        if cache_key not in row_cubes:
+            row_cubes[cache_key] = _rows_rollup(rollup, rows)
+        cube = row_cubes[cache_key]
+        if cube is None:
+            # Ни одной строки с датой приёма - пустой срез той же структуры
+            return slice_rollup(rollup, by=by, freq=freq, start=start, end=end).head(0)
+        return slice_rollup(cube, by=by, freq=freq, start=start, end=end)
+    return rollup_slice
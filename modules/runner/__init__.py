@@ -0,0 +1,3 @@
+from .code_analysis import compile_formula, prune_frame, is_pruned_column_error
+
+__all__ = ['compile_formula', 'prune_frame', 'is_pruned_column_error']
\ No newline at end of file
@@ -0,0 +1,223 @@
+# PROJECT_ROOT: modules/runner/code_analysis.py
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+CODE_CACHE_SIZE = 128
+FRAME_NAME = 'df'
+
+# Методы, результат которых безопасен, если дальше явно выбраны столбцы
+SELECTING_METHODS = {'groupby', 'sort_values', 'set_index', 'nlargest', 'nsmallest'}
+# Без subset= отбор строк зависит от всех столбцов
+SUBSET_METHODS = {'dropna', 'drop_duplicates'}
+AGG_METHODS = {'agg', 'aggregate'}
+# Методы Series, возвращающие булеву маску строк
+MASK_METHODS = {'isin', 'between', 'isna', 'notna', 'isnull', 'notnull', 'contains', 'startswith', 'endswith'}
+
+_code_cache = OrderedDict()
+_code_cache_lock = threading.Lock()
+
+
+def _constant_values(node):
+    """Значения константы или списка констант; None - если выражение вычисляется"""
+    if isinstance(node, ast.Constant):
+        return {node.value}
+    if isinstance(node, (ast.List, ast.Tuple)) and all(isinstance(item, ast.Constant) for item in node.elts):
+        return {item.value for item in node.elts}
+    return None
+
+
+def _is_row_mask(node):
+    """df[df['a'] > 1], df[(...) & (...)], df[df['a'].isin([...])] - отбор строк, а не столбцов"""
+    if isinstance(node, ast.Compare):
+        return True
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+        return True
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert):
+        return True
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in MASK_METHODS
+
+
+def _call_constants(call):
+    """Константы в аргументах вызова; None - если есть вычисляемые аргументы"""
+    values = set()
+    for arg in list(call.args) + [keyword.value for keyword in call.keywords]:
+        if isinstance(arg, ast.Constant) and not isinstance(arg.value, str):
+            continue
+        found = _constant_values(arg)
+        if found is None:
+            return None
+        values |= found
+    return values
+
+
+def _subset_columns(call):
+    """Столбцы subset в dropna/drop_duplicates; None - если subset не задан явно"""
+    subset = None
+    for keyword in call.keywords:
+        if keyword.arg == 'subset':
+            subset = keyword.value
+        elif keyword.arg in (None, 'axis'):
+            return None
+    if call.args:
+        # Первый позиционный аргумент: subset у drop_duplicates, axis у dropna
+        if call.func.attr != 'drop_duplicates' or subset is not None:
+            return None
+        subset = call.args[0]
+    return None if subset is None else _constant_values(subset)
+
+
+def _agg_columns(call):
+    """Столбцы в agg({'столбец': 'sum'}) и agg(имя=('столбец', 'sum'))"""
+    values = set()
+    for arg in call.args:
+        # agg('sum'), agg(['sum', 'mean']) применяются ко всем столбцам
+        if not (isinstance(arg, ast.Dict) and all(isinstance(key, ast.Constant) for key in arg.keys)):
+            return None
+        values |= {key.value for key in arg.keys}
+    for keyword in call.keywords:
+        value = keyword.value
+        if isinstance(value, ast.Tuple) and value.elts and isinstance(value.elts[0], ast.Constant):
+            values.add(value.elts[0].value)
+        else:
+            return None
+    return values
+
+
+def _method_chain_columns(attribute, parents):
+    """df.groupby('a')['b'], df.sort_values('a')[['b']], df.groupby('a').agg(...)"""
+    call = parents.get(attribute)
+    if not isinstance(call, ast.Call) or call.func is not attribute:
+        return None
+    keys = _subset_columns(call) if attribute.attr in SUBSET_METHODS else _call_constants(call)
+    if keys is None:
+        return None
+
+    consumer = parents.get(call)
+    if isinstance(consumer, ast.Subscript) and consumer.value is call:
+        selected = _constant_values(consumer.slice)
+        return None if selected is None else keys | selected
+    if attribute.attr == 'groupby' and isinstance(consumer, ast.Attribute) and consumer.value is call:
+        if consumer.attr in ('size', 'ngroups'):
+            return keys
+        agg_call = parents.get(consumer)
+        if consumer.attr in AGG_METHODS and isinstance(agg_call, ast.Call) and agg_call.func is consumer:
+            aggregated = _agg_columns(agg_call)
+            return None if aggregated is None else keys | aggregated
+    return None
+
+
+def _is_len_call(node, parents):
+    """len(выражение)"""
+    call = parents.get(node)
+    return isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == 'len' \
+        and call.args == [node]
+
+
+def _masked_use(subscript, parents):
+    """df[маска] сохраняет все столбцы; безопасен, только если дальше явно выбраны столбцы"""
+    consumer = parents.get(subscript)
+    if isinstance(consumer, ast.Subscript) and consumer.value is subscript:
+        # df[маска]['a'], df[маска][['a', 'b']]
+        return _constant_values(consumer.slice)
+    if _is_len_call(subscript, parents):
+        return set()
+    return None
+
+
+def _frame_use(node, parents):
+    """Столбцы, нужные при данном обращении к df; None - доступ динамический"""
+    parent = parents.get(node)
+
+    # df['a'], df[['a', 'b']], df[маска]['a']
+    if isinstance(parent, ast.Subscript) and parent.value is node:
+        if _is_row_mask(parent.slice):
+            return _masked_use(parent, parents)
+        return _constant_values(parent.slice)
+
+    if isinstance(parent, ast.Attribute) and parent.value is node:
+        attr = parent.attr
+        if attr == 'index':
+            return set()
+        if attr == 'shape':
+            # Число строк не зависит от набора столбцов
+            grand = parents.get(parent)
+            if isinstance(grand, ast.Subscript) and isinstance(grand.slice, ast.Constant) and grand.slice.value == 0:
+                return set()
+            return None
+        if attr in SELECTING_METHODS or attr in SUBSET_METHODS:
+            return _method_chain_columns(parent, parents)
+        if not hasattr(pd.DataFrame, attr):
+            # df.Столбец
+            return {attr}
+        return None
+
+    # len(df)
+    if _is_len_call(node, parents):
+        return set()
+    return None
+
+
+def referenced_columns(tree, frame_name=FRAME_NAME):
+    """Столбцы df, к которым код обращается статически; None - если доступ динамический"""
+    parents = {}
+    for node in ast.walk(tree):
+        for child in ast.iter_child_nodes(node):
+            parents[child] = node
+
+    columns = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Name) or node.id != frame_name:
+            continue
+        if not isinstance(node.ctx, ast.Load):
+            continue
+        used = _frame_use(node, parents)
+        if used is None:
+            return None
+        columns |= used
+    return columns
+
+
+def compile_formula(formula):
+    """Компилирует код один раз: объект кода и статические столбцы кэшируются по хэшу"""
+    digest = hashlib.sha256(formula.encode('utf-8')).hexdigest()
+    with _code_cache_lock:
+        cached = _code_cache.get(digest)
+        if cached is not None:
+            _code_cache.move_to_end(digest)
+            return cached
+
+    tree = ast.parse(formula, filename='<formula>', mode='exec')
+    cached = (compile(tree, '<formula>', 'exec'), referenced_columns(tree))
+
+    with _code_cache_lock:
+        _code_cache[digest] = cached
+        while len(_code_cache) > CODE_CACHE_SIZE:
+            _code_cache.popitem(last=False)
+    return cached
+
+
+def prune_frame(df, columns):
+    """Копия датасета только с нужными столбцами; при динамическом доступе - полная"""
+    if columns is None:
+        return df.copy(), False
+    keep = [col for col in df.columns if col in columns]
+    if len(keep) == len(df.columns):
+        return df.copy(), False
+    return df[keep], True
+
+
+def is_pruned_column_error(error, df, frame):
+    """KeyError/AttributeError вызван столбцом, который был отсечён перед запуском"""
+    removed = [col for col in df.columns if col not in frame.columns]
+    if isinstance(error, AttributeError):
+        return getattr(error, 'name', None) in removed
+    key = error.args[0] if error.args else None
+    if any(key == col for col in removed if isinstance(col, type(key))):
+        return True
+    # df[['a', 'b']]: pandas перечисляет отсутствующие столбцы в тексте ошибки
+    return isinstance(key, str) and any(repr(col) in key for col in removed)
@@ -0,0 +1,3 @@
+from .table_viewer import show_table
+
+__all__ = ['show_table']
\ No newline at end of file
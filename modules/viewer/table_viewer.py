@@ -0,0 +1,222 @@
+# PROJECT_ROOT: modules/viewer/table_viewer.py
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+PAGE_SIZES = [10, 25, 50, 100, 500]
+ALL_COLUMNS = "Все столбцы"
+EXPORT_CHUNK_ROWS = 50_000
+
+
+def _unique_columns(table):
+    """Повторяющиеся имена столбцов (pd.concat(axis=1)) получают суффиксы _2, _3..."""
+    if table.columns.is_unique:
+        return table
+    labels = []
+    used = set(table.columns)
+    for col in table.columns:
+        if col in labels:
+            index = 2
+            while f"{col}_{index}" in used:
+                index += 1
+            col = f"{col}_{index}"
+            used.add(col)
+        labels.append(col)
+    return table.set_axis(labels, axis=1)
+
+
+def index_as_columns(table):
+    """Переносит значимый индекс (ключи группировки, подписи строк) в столбцы.
+
+    Безымянный целочисленный индекс - просто номера строк, он отбрасывается.
+    Повторяющиеся имена столбцов делаются уникальными - иначе таблицу не
+    отобразить и не выгрузить в Parquet.
+    """
+    if isinstance(table, pd.Series):
+        table = table.to_frame()
+    table = _unique_columns(table)
+    index = table.index
+    if index.nlevels == 1 and index.name is None and pd.api.types.is_integer_dtype(index):
+        return table
+
+    names = []
+    for level, name in enumerate(index.names):
+        if name is None:
+            name = "index" if index.nlevels == 1 else f"level_{level}"
+        # Имя уровня не должно совпадать со столбцом
+        while name in table.columns or name in names:
+            name = f"{name}_"
+        names.append(name)
+    return table.rename_axis(names).reset_index()
+
+
+def _display_table(table, key):
+    """Таблица с индексом в столбцах; пересчитывается, только если сменилась исходная"""
+    cache_key = f"viewer_{key}_table"
+    source = (id(table), table.shape)
+    cached = st.session_state.get(cache_key)
+    if cached is None or cached["source"] != source:
+        cached = {"source": source, "table": index_as_columns(table)}
+        st.session_state[cache_key] = cached
+    return cached["table"]
+
+
+def _view_signature(table, sort_col, ascending, filter_col, query):
+    """Ключ закэшированного представления таблицы"""
+    return (id(table), table.shape, sort_col, ascending, filter_col, query)
+
+
+def _filter_mask(table, filter_col, query):
+    """Маска строк, содержащих подстроку (без учёта регистра)"""
+    positions = range(table.shape[1]) if filter_col == ALL_COLUMNS else [filter_col]
+    mask = np.zeros(len(table), dtype=bool)
+    for position in positions:
+        # По позиции: имена столбцов могут повторяться (pd.concat(axis=1))
+        values = table.iloc[:, position]
+        mask |= values.astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+    return mask
+
+
+def compute_view(table, sort_col=None, ascending=True, filter_col=ALL_COLUMNS, query=""):
+    """Возвращает позиции строк таблицы после фильтрации и сортировки.
+
+    sort_col и filter_col - номера столбцов, а не имена.
+    """
+    positions = np.arange(len(table))
+
+    if query:
+        positions = positions[_filter_mask(table, filter_col, query)]
+
+    if sort_col is not None and len(positions) > 0:
+        column = table.iloc[positions, sort_col].reset_index(drop=True)
+        try:
+            order = column.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        except TypeError:
+            # Смешанные типы в столбце - сортируем как строки
+            order = column.astype(str).sort_values(ascending=ascending, kind="stable").index.to_numpy()
+        positions = positions[order]
+
+    return positions
+
+
+def _get_view(table, key, sort_col, ascending, filter_col, query):
+    """Позиции строк из кэша сессии, пересчёт только при изменении параметров"""
+    cache_key = f"viewer_{key}_view"
+    signature = _view_signature(table, sort_col, ascending, filter_col, query)
+    cached = st.session_state.get(cache_key)
+    if cached is None or cached["signature"] != signature:
+        cached = {
+            "signature": signature,
+            "positions": compute_view(table, sort_col, ascending, filter_col, query),
+        }
+        st.session_state[cache_key] = cached
+    return cached["positions"]
+
+
+def write_csv_chunks(table, positions, file, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Пишет строки таблицы в CSV порциями, не собирая весь текст в памяти"""
+    for start in range(0, len(positions), chunk_rows):
+        chunk = table.iloc[positions[start:start + chunk_rows]]
+        chunk.to_csv(file, index=False, header=(start == 0))
+    if len(positions) == 0:
+        table.head(0).to_csv(file, index=False)
+
+
+def _prepare_download(table, positions):
+    """Выгружает представление во временный файл на сервере"""
+    file = tempfile.NamedTemporaryFile(
+        mode="w", suffix=".csv", encoding="utf-8-sig", newline="", delete=False
+    )
+    try:
+        with file:
+            write_csv_chunks(table, positions, file)
+    except Exception:
+        os.remove(file.name)
+        raise
+    return file.name
+
+
+def show_table(table, key, page_size=50):
+    """Постраничный просмотр таблицы: в браузер уходит только текущая страница"""
+    # Ключи группировки становятся обычными столбцами: их видно, по ним ищут и сортируют
+    table = _display_table(table, key)
+
+    total_rows = len(table)
+    columns = [str(c) for c in table.columns]
+
+    # Управление: фильтр, сортировка, размер страницы
+    ctrl1, ctrl2, ctrl3, ctrl4, ctrl5 = st.columns([2, 3, 2, 1, 1])
+    with ctrl1:
+        filter_col = st.selectbox(
+            "Фильтр по:",
+            [ALL_COLUMNS] + list(range(len(columns))),
+            format_func=lambda option: option if option == ALL_COLUMNS else columns[option],
+            key=f"viewer_{key}_filter_col",
+        )
+    with ctrl2:
+        query = st.text_input("Содержит:", key=f"viewer_{key}_query", placeholder="Введите для поиска...")
+    with ctrl3:
+        sort_col = st.selectbox(
+            "Сортировка:",
+            [None] + list(range(len(columns))),
+            format_func=lambda option: "—" if option is None else columns[option],
+            key=f"viewer_{key}_sort",
+        )
+    with ctrl4:
+        ascending = st.radio("Порядок", ["↑", "↓"], key=f"viewer_{key}_order", horizontal=True) == "↑"
+    with ctrl5:
+        page_size = st.selectbox(
+            "Строк:",
+            PAGE_SIZES,
+            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 0,
+            key=f"viewer_{key}_page_size",
+        )
+
+    positions = _get_view(table, key, sort_col, ascending, filter_col, query)
+    view_rows = len(positions)
+    page_count = max(1, -(-view_rows // page_size))
+
+    page = 1
+    page_key = f"viewer_{key}_page"
+    if st.session_state.get(page_key, 1) > page_count:
+        # После фильтрации страниц стало меньше
+        st.session_state[page_key] = page_count
+    if page_count > 1:
+        page = st.number_input(
+            f"Страница (из {page_count}):",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key=page_key,
+        )
+    start = (int(page) - 1) * page_size
+    end = min(start + page_size, view_rows)
+
+    # В браузер отправляется только видимая страница
+    st.dataframe(table.iloc[positions[start:end]], use_container_width=True)
+
+    if view_rows < total_rows:
+        st.caption(f"Строки {start + 1 if view_rows else 0}–{end} из {view_rows} (всего в таблице: {total_rows})")
+    else:
+        st.caption(f"Строки {start + 1 if view_rows else 0}–{end} из {total_rows}")
+
+    # Выгрузка полного результата с учётом фильтра и сортировки.
+    # Файл готовится по нажатию и отдаётся один раз, затем удаляется с диска.
+    if st.button("📦 Подготовить выгрузку", key=f"viewer_{key}_prepare"):
+        with st.spinner("Подготовка файла..."):
+            path = _prepare_download(table, positions)
+        try:
+            with open(path, "rb") as file:
+                st.download_button(
+                    "⬇️ Скачать полный результат (CSV)",
+                    data=file,
+                    file_name=f"{key}.csv",
+                    mime="text/csv",
+                    key=f"viewer_{key}_download_btn",
+                )
+        finally:
+            os.remove(path)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.runner import compile_formula, is_pruned_column_error, prune_frame
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'a': [1, 2, 2, 3, np.nan, 1],
+        'b': [10, 20, 20, 30, 40, 10],
+        'c': ['x', 'y', 'y', None, 'z', 'x'],
+        'd': [1.5, 2.5, 3.5, 4.5, 5.5, 1.5],
+        'Отдел': ['A', 'B', 'B', 'A', 'C', 'A'],
+    })
+
+
+def run(code, frame):
+    local_vars = {'df': frame, 'pd': pd, 'np': np}
+    exec(code, local_vars)
+    return local_vars['result']
+
+
+# Код и столбцы, которые должен оставить разбор; None - датасет не отсекается
+PATTERNS = [
+    ("result = df['a'].sum()", {'a'}),
+    ("result = df[['a', 'b']]", {'a', 'b'}),
+    ("result = df.Отдел.value_counts()", {'Отдел'}),
+    ("result = len(df)", set()),
+    ("result = df.shape[0]", set()),
+    ("result = df[df['a'] > 1]['b'].sum()", {'a', 'b'}),
+    ("result = df[(df['a'] > 1) & (df['Отдел'] == 'B')][['b', 'd']]", {'a', 'Отдел', 'b', 'd'}),
+    ("result = len(df[df['c'].isin(['x'])])", {'c'}),
+    ("result = df.groupby('Отдел')['b'].sum()", {'Отдел', 'b'}),
+    ("result = df.groupby('Отдел').agg({'b': 'sum', 'd': 'mean'})", {'Отдел', 'b', 'd'}),
+    ("result = df.groupby('Отдел').agg(total=('b', 'sum'))", {'Отдел', 'b'}),
+    ("result = df.groupby('Отдел').size()", {'Отдел'}),
+    ("result = df.sort_values('d')[['b']]", {'d', 'b'}),
+    ("result = df.nlargest(2, 'd')['b']", {'d', 'b'}),
+    ("result = df.dropna(subset=['a'])['b'].sum()", {'a', 'b'}),
+    ("result = df.drop_duplicates(subset=['a', 'b'])[['a']]", {'a', 'b'}),
+    ("result = df.drop_duplicates('b')['d']", {'b', 'd'}),
+    # Зависят от всех столбцов - отсекать нельзя
+    ("result = df[df['a'] > 1]", None),
+    ("result = df.dropna()['a'].sum()", None),
+    ("result = df.drop_duplicates()[['a']]", None),
+    ("result = df.dropna(axis=1)['b']", None),
+    ("result = df.describe()", None),
+    ("result = df.groupby('Отдел').agg('sum')", None),
+    ("result = df.groupby('Отдел').agg(['sum', 'max'])", None),
+    ("result = df.groupby('Отдел').aggregate('max')", None),
+    ("col = 'b'\nresult = df[col].sum()", None),
+]
+
+
+@pytest.mark.parametrize("code, expected", PATTERNS)
+def test_pruned_run_matches_full_run(df, code, expected):
+    compiled, columns = compile_formula(code)
+    assert columns == expected
+
+    frame, pruned = prune_frame(df, columns)
+    assert pruned == (expected is not None and set(expected) != set(df.columns))
+    pruned_result = run(compiled, frame)
+    full_result = run(compiled, df.copy())
+
+    if isinstance(full_result, pd.DataFrame):
+        pd.testing.assert_frame_equal(pruned_result, full_result)
+    elif isinstance(full_result, pd.Series):
+        pd.testing.assert_series_equal(pruned_result, full_result)
+    else:
+        assert pruned_result == full_result
+
+
+def test_pruned_column_error_detects_removed_columns(df):
+    frame, _ = prune_frame(df, {'a'})
+    assert is_pruned_column_error(KeyError('b'), df, frame)
+    with pytest.raises(KeyError) as error:
+        frame[['a', 'b']]
+    assert is_pruned_column_error(error.value, df, frame)
+    with pytest.raises(AttributeError) as error:
+        frame.Отдел
+    assert is_pruned_column_error(error.value, df, frame)
+
+
+def test_user_errors_are_not_pruning_errors(df):
+    frame, _ = prune_frame(df, {'a'})
+    assert not is_pruned_column_error(KeyError('нет такого столбца'), df, frame)
+    assert not is_pruned_column_error(KeyError('a'), df, frame)
+    with pytest.raises(AttributeError) as error:
+        frame['a'].no_such_method()
+    assert not is_pruned_column_error(error.value, df, frame)
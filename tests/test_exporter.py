@@ -0,0 +1,89 @@
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.export import export_results
+from modules.export.exporter import FORMAT_CSV, FORMAT_PARQUET, FORMAT_XLSX, discard_export
+from modules.rollups import build_rollup, slice_rollup
+
+
+@pytest.fixture
+def staff():
+    rng = np.random.default_rng(0)
+    n = 200
+    hire = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 700, n), unit='D')
+    exit_ = (hire + pd.to_timedelta(rng.integers(30, 900, n), unit='D')).where(rng.random(n) < 0.4)
+    return pd.DataFrame({
+        'Табельный номер': np.arange(n),
+        'Отдел': rng.choice(['Продажи', 'ИТ', 'Склад'], n),
+        'Зарплата': rng.integers(50, 200, n) * 1000,
+        'Дата приема': hire,
+        'Дата увольнения': exit_,
+    })
+
+
+def read_back(path, file_format):
+    """Таблицы из выгрузки по именам"""
+    if file_format == FORMAT_XLSX:
+        return pd.read_excel(path, sheet_name=None)
+    reader = pd.read_parquet if file_format == FORMAT_PARQUET else pd.read_csv
+    if path.suffix != '.zip':
+        return {path.stem: reader(path)}
+    tables = {}
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            with archive.open(name) as file:
+                tables[name.rsplit('.', 1)[0]] = reader(file)
+    return tables
+
+
+@pytest.mark.parametrize("file_format", [FORMAT_XLSX, FORMAT_PARQUET, FORMAT_CSV])
+def test_rollup_slice_export(staff, file_format):
+    table = slice_rollup(build_rollup(staff), by='Отдел', freq='Q')
+    path = export_results([('rollup', table)], [], file_format, 'staff')
+    try:
+        exported = read_back(path, file_format)['rollup']
+        assert len(exported) == len(table)
+        assert exported['period'].astype(str).tolist() == table['period'].astype(str).tolist()
+        assert exported['headcount'].tolist() == table['headcount'].tolist()
+    finally:
+        discard_export(path)
+
+
+@pytest.mark.parametrize("file_format", [FORMAT_XLSX, FORMAT_PARQUET, FORMAT_CSV])
+def test_group_keys_are_exported(staff, file_format):
+    by_department = staff.groupby('Отдел')['Зарплата'].sum().to_frame()
+    filtered = staff[staff['Зарплата'] > 100_000]
+    path = export_results([('by_department', by_department), ('data', filtered)], [], file_format, 'staff')
+    try:
+        exported = read_back(path, file_format)
+        assert exported['by_department'].columns.tolist() == ['Отдел', 'Зарплата']
+        assert exported['by_department']['Отдел'].tolist() == by_department.index.tolist()
+        # Номера строк отфильтрованного датасета не выгружаются
+        assert exported['data'].columns.tolist() == staff.columns.tolist()
+        assert len(exported['data']) == len(filtered)
+    finally:
+        discard_export(path)
+
+
+def test_failed_export_leaves_no_directory(staff, tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+
+    class BrokenChart:
+        def write_html(self, path, include_plotlyjs):
+            raise RuntimeError('render failed')
+
+    with pytest.raises(RuntimeError):
+        export_results([('data', staff)], [('chart', BrokenChart())], FORMAT_CSV, 'staff')
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bundle_keeps_only_archive(staff):
+    path = export_results([('a', staff), ('b', staff.head(5))], [], FORMAT_PARQUET, 'staff')
+    try:
+        assert [file.name for file in path.parent.iterdir()] == ['staff.zip']
+    finally:
+        discard_export(path)
@@ -0,0 +1,83 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.network.graph_engine import (
+    betweenness,
+    build_graph,
+    graph_from_manager_column,
+    louvain,
+    modularity,
+    pagerank,
+)
+
+
+def from_networkx(nx_graph):
+    """Граф движка из графа networkx (рёбра в обе стороны для неориентированного)"""
+    edges = pd.DataFrame(list(nx_graph.edges()), columns=['source', 'target'])
+    return build_graph(edges['source'], edges['target'], directed=nx_graph.is_directed())
+
+
+def by_node(graph, values):
+    return dict(zip(graph['nodes'].tolist(), values))
+
+
+@pytest.fixture(params=['karate', 'directed'])
+def nx_graph(request):
+    if request.param == 'karate':
+        return nx.karate_club_graph()
+    graph = nx.gnp_random_graph(60, 0.08, seed=3, directed=True)
+    graph.remove_nodes_from(list(nx.isolates(graph)))
+    return graph
+
+
+def test_pagerank_matches_networkx(nx_graph):
+    graph = from_networkx(nx_graph)
+    ours = by_node(graph, pagerank(graph, tol=1e-12, max_iter=1000))
+    expected = nx.pagerank(nx_graph, alpha=0.85, tol=1e-12, max_iter=1000, weight=None)
+    for node, value in expected.items():
+        assert ours[node] == pytest.approx(value, abs=1e-8)
+
+
+def test_exact_betweenness_matches_networkx(nx_graph):
+    graph = from_networkx(nx_graph)
+    # Выборка из всех узлов - точный алгоритм Brandes
+    ours = by_node(graph, betweenness(graph, samples=len(graph['nodes']), workers=1))
+    expected = nx.betweenness_centrality(nx_graph, normalized=True)
+    for node, value in expected.items():
+        assert ours[node] == pytest.approx(value, abs=1e-9)
+
+
+def test_modularity_matches_networkx():
+    nx_graph = nx.karate_club_graph()
+    graph = from_networkx(nx_graph)
+    clubs = [nx_graph.nodes[node]['club'] for node in graph['nodes']]
+    expected = nx.community.modularity(
+        nx_graph, [{n for n in nx_graph if nx_graph.nodes[n]['club'] == club} for club in set(clubs)], weight=None
+    )
+    assert modularity(graph, np.array(clubs)) == pytest.approx(expected)
+
+
+def test_louvain_quality_close_to_networkx():
+    nx_graph = nx.karate_club_graph()
+    graph = from_networkx(nx_graph)
+    labels = louvain(graph)
+    ours = modularity(graph, labels)
+
+    communities = {}
+    for node, label in zip(graph['nodes'].tolist(), labels):
+        communities.setdefault(label, set()).add(node)
+    assert ours == pytest.approx(nx.community.modularity(nx_graph, communities.values(), weight=None))
+
+    reference = nx.community.modularity(
+        nx_graph, nx.community.louvain_communities(nx_graph, weight=None, seed=1), weight=None
+    )
+    assert ours >= reference - 0.02
+
+
+def test_manager_graph_keeps_integer_ids():
+    df = pd.DataFrame({'Сотрудник': [1, 2, 3, 4], 'Руководитель': [np.nan, 1, 1, 2]})
+    graph = graph_from_manager_column(df, 'Сотрудник', 'Руководитель')
+    assert graph['nodes'].dtype == df['Сотрудник'].dtype
+    assert sorted(graph['nodes'].tolist()) == [1, 2, 3, 4]
@@ -0,0 +1,104 @@
+import pytest
+
+from modules.chat import response_cache
+from modules.chat.response_cache import cache_stats, get_cached_response, store_response
+
+MODEL = 'llama3'
+DIGEST = 'sha256:abc'
+QUESTION = ('Объясни, почему текучесть в отделе продаж выросла во втором квартале '
+            'и какие сотрудники уходили чаще всего после года работы в компании')
+
+
+def conversation(question):
+    return [
+        {'role': 'system', 'content': 'Ты HR-аналитик'},
+        {'role': 'user', 'content': question},
+    ]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / 'cache.sqlite'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_exact_hit_ignores_whitespace(path, clock):
+    store_response(MODEL, DIGEST, {}, conversation(QUESTION), 'ответ', path=path)
+    spaced = conversation('  ' + QUESTION.replace(' ', '\n  '))
+    assert get_cached_response(MODEL, DIGEST, {}, spaced, path=path) == 'ответ'
+    assert get_cached_response(MODEL, 'sha256:new', {}, spaced, path=path) is None
+    assert get_cached_response(MODEL, DIGEST, {'temperature': 0.1}, spaced, path=path) is None
+
+
+def test_entries_expire_after_ttl(path, clock):
+    store_response(MODEL, DIGEST, {}, conversation(QUESTION), 'ответ', path=path)
+    clock[0] += response_cache.CACHE_TTL_SECONDS - 1
+    assert get_cached_response(MODEL, DIGEST, {}, conversation(QUESTION), path=path) == 'ответ'
+    clock[0] += 2
+    assert get_cached_response(MODEL, DIGEST, {}, conversation(QUESTION), path=path) is None
+
+
+def test_size_limit_evicts_least_recently_used(path, clock, monkeypatch):
+    monkeypatch.setattr(response_cache, 'CACHE_MAX_BYTES', 250)
+    for index in range(2):
+        store_response(MODEL, DIGEST, {}, conversation(f'вопрос {index}'), 'x' * 100, path=path)
+        clock[0] += 1
+    # Первый ответ использован недавно - при переполнении вытесняется второй
+    assert get_cached_response(MODEL, DIGEST, {}, conversation('вопрос 0'), path=path) is not None
+    clock[0] += 1
+    store_response(MODEL, DIGEST, {}, conversation('вопрос 2'), 'x' * 100, path=path)
+
+    assert cache_stats(path)['bytes'] <= 250
+    assert get_cached_response(MODEL, DIGEST, {}, conversation('вопрос 0'), path=path) is not None
+    assert get_cached_response(MODEL, DIGEST, {}, conversation('вопрос 1'), path=path) is None
+    assert get_cached_response(MODEL, DIGEST, {}, conversation('вопрос 2'), path=path) is not None
+
+
+def test_near_duplicate_threshold(path, clock, monkeypatch):
+    similar = QUESTION.replace('чаще всего', 'чаще')
+    distance = bin((response_cache._simhash(QUESTION) ^ response_cache._simhash(similar)) & (2 ** 64 - 1)).count('1')
+    assert distance > 0
+
+    store_response(MODEL, DIGEST, {}, conversation(QUESTION), 'ответ', path=path)
+    assert get_cached_response(MODEL, DIGEST, {}, conversation(similar), path=path) is None
+
+    monkeypatch.setattr(response_cache, 'NEAR_DUPLICATE_DISTANCE', distance)
+    assert get_cached_response(MODEL, DIGEST, {}, conversation(similar), near_duplicate=True, path=path) == 'ответ'
+
+    monkeypatch.setattr(response_cache, 'NEAR_DUPLICATE_DISTANCE', distance - 1)
+    assert get_cached_response(MODEL, DIGEST, {}, conversation(similar), near_duplicate=True, path=path) is None
+
+
+def test_near_duplicate_requires_same_context(path, clock):
+    store_response(MODEL, DIGEST, {}, conversation(QUESTION), 'ответ', path=path)
+    other_context = [{'role': 'system', 'content': 'Ты юрист'}, {'role': 'user', 'content': QUESTION + '?'}]
+    assert get_cached_response(MODEL, DIGEST, {}, other_context, near_duplicate=True, path=path) is None
+
+
+def test_chat_sends_no_options_and_caches_reply(path, monkeypatch):
+    from modules.chat import chat_page
+
+    sent = []
+
+    class Reply:
+        status_code = 200
+
+        def json(self):
+            return {'message': {'content': 'ответ'}}
+
+    monkeypatch.setattr(chat_page, 'get_model_digest', lambda model: DIGEST)
+    monkeypatch.setattr(chat_page.requests, 'post', lambda url, json: sent.append(json) or Reply())
+    monkeypatch.setattr(chat_page, 'get_cached_response',
+                        lambda *args, **kwargs: get_cached_response(*args, **kwargs, path=path))
+    monkeypatch.setattr(chat_page, 'store_response', lambda *args: store_response(*args, path=path))
+
+    assert chat_page.send_message_to_ollama(MODEL, conversation(QUESTION)) == 'ответ'
+    assert chat_page.send_message_to_ollama(MODEL, conversation(QUESTION)) == 'ответ'
+    assert len(sent) == 1
+    assert 'options' not in sent[0]
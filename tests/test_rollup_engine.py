@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.rollups import bind_rollup, build_rollup, slice_rollup
+
+
+@pytest.fixture
+def staff():
+    rng = np.random.default_rng(7)
+    n = 500
+    hire = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 900, n), unit='D')
+    exit_ = (hire + pd.to_timedelta(rng.integers(30, 900, n), unit='D')).where(rng.random(n) < 0.4)
+    return pd.DataFrame({
+        'Табельный номер': np.arange(n),
+        'Отдел': rng.choice(['Продажи', 'ИТ', 'Склад'], n),
+        'Город': [f'Город {i}' for i in rng.integers(0, 200, n)],
+        'Дата приема': hire,
+        'Дата увольнения': exit_,
+    })
+
+
+def test_dimension_filters_use_prebuilt_cube(staff):
+    rollup = build_rollup(staff)
+    assert 'Отдел' in rollup['dimensions']
+    slice_ = bind_rollup(rollup, {}, staff, staff)(filters={'Отдел': ['ИТ']}, by='Отдел')
+    pd.testing.assert_frame_equal(slice_, slice_rollup(rollup, {'Отдел': ['ИТ']}, by='Отдел'))
+
+
+def test_date_range_filter_counts_hires_in_range(staff):
+    rollup = build_rollup(staff)
+    start, end = pd.Timestamp('2021-01-01'), pd.Timestamp('2021-06-30')
+    slice_ = bind_rollup(rollup, {}, staff, staff)(filters={'Дата приема': [start, end], 'Отдел': ['ИТ']})
+
+    expected = staff[staff['Дата приема'].between(start, end) & (staff['Отдел'] == 'ИТ')]
+    assert slice_['hires'].sum() == len(expected) > 0
+
+
+def test_default_filters_outside_cube_use_filtered_rows(staff):
+    rollup = build_rollup(staff)
+    filters = {'Город': ['Город 1', 'Город 2', 'Город 3'], 'Отдел': ['Склад']}
+    filtered = staff[staff['Город'].isin(filters['Город']) & (staff['Отдел'] == 'Склад')]
+
+    slice_ = bind_rollup(rollup, filters, staff, filtered)()
+    assert slice_['hires'].sum() == len(filtered)
+    assert slice_['exits'].sum() == filtered['Дата увольнения'].notna().sum()
+
+
+def test_filters_on_missing_columns_are_skipped(staff):
+    rollup = build_rollup(staff)
+    slice_ = bind_rollup(rollup, {}, staff, staff)(filters={'Нет такого столбца': ['x'], 'Отдел': ['ИТ']})
+    assert slice_['hires'].sum() == (staff['Отдел'] == 'ИТ').sum()